@@ -9,16 +9,25 @@ import hashlib
 import logging
 import os
 
-import asyncpg.exceptions
-
 from orm import state
 from orm.columns import DateTime, Float, Integer, String
 from orm.connections import Connection, construct_dsn
 from orm.functions import SqlFunction
+from orm.migrations import (
+    MigrationStep,
+    fetch_live_columns,
+    generate_alter_migration_steps,
+)
+from orm.partitions import (
+    PartitionInterval,
+    RangePartition,
+    create_future_partitions,
+    fetch_is_partitioned,
+)
 from orm.queries import Order
 from orm.queries.insert import insert
 from orm.queries.select import select
-from orm.sql_generation import generate_up_migration_code
+from orm.sql_generation import generate_cache_trigger_code, generate_up_migration_code
 from orm.tables import Table, table_instance
 
 logging.basicConfig(level=os.getenv("LOG_LEVEL", logging.INFO))
@@ -57,50 +66,71 @@ class Payments(Table):
     created_at = DateTime("payments", "created_at", default=SqlFunction.NOW)
     updated_at = DateTime("payments", "updated_at", nullable=True, default=None)
 
+    __partition_by__ = RangePartition(created_at, PartitionInterval.MONTH)
+
 
 async def run_database_migrations(dsn: str) -> None:
     async with Connection(dsn) as connection:
         for table_name, table in state.TABLE_INSTANCES.items():
-            migration_sql = generate_up_migration_code(table)
-            migration_hash = hashlib.sha256(migration_sql.encode()).hexdigest()
-
-            # check if migration has already been run
-            query = (
-                select([Migrations])
-                .from_table(Migrations)
-                .where(
-                    [
-                        Migrations.migration_name == table_name,
-                        Migrations.migration_hash == migration_hash,
-                    ]
+            live_columns = await fetch_live_columns(connection, table_name)
+            if not live_columns:
+                steps = [MigrationStep(generate_up_migration_code(table))]
+            elif table.__partition_by__ is not None and not (
+                await fetch_is_partitioned(connection, table)
+            ):
+                logging.warning(
+                    "Skipping migration for %s: converting an existing table "
+                    "to a partitioned table must be done manually",
+                    table_name,
                 )
-            )
-            try:
-                rec = await connection.fetch_one(query)
-            except asyncpg.exceptions.UndefinedTableError:
-                # if we're about to create the migrations table, let it pass
-                # otherwise, raise the error because we won't be able to track
-                # the creation of the table
-                assert table_name == "migrations", "migrations table doesn't exist"
-                rec = None
-
-            if rec:
                 continue
-
-            await connection.execute(migration_sql)
-
-            # insert migration record
-            query = (
-                insert()
-                .into_table(Migrations)
-                .values(
-                    [
-                        (Migrations.migration_name, table_name),
-                        (Migrations.migration_hash, migration_hash),
-                    ],
+            else:
+                steps = generate_alter_migration_steps(table, live_columns)
+
+            if steps:
+                # refuse to run steps which would rewrite or lock a potentially
+                # large table; these must be planned & run manually
+                blocking_steps = [step for step in steps if step.is_blocking]
+                if blocking_steps:
+                    for step in blocking_steps:
+                        logging.warning(
+                            "Skipping migration for %s: %s (%s)",
+                            table_name,
+                            step.sql,
+                            step.blocking_reason,
+                        )
+                    continue
+
+                # NOTE: each step runs in its own transaction so that
+                # e.g. VALIDATE CONSTRAINT doesn't hold the lock taken
+                # by the preceding ADD CONSTRAINT ... NOT VALID
+                for step in steps:
+                    await connection.execute(step.sql)
+
+                migration_sql = "\n".join(step.sql for step in steps)
+                migration_hash = hashlib.sha256(migration_sql.encode()).hexdigest()
+
+                # insert migration record
+                query = (
+                    insert()
+                    .into_table(Migrations)
+                    .values(
+                        [
+                            (Migrations.migration_name, table_name),
+                            (Migrations.migration_hash, migration_hash),
+                        ],
+                    )
                 )
-            )
-            await connection.execute(query)
+                await connection.execute(query)
+
+            # keep rolling partitions created ahead of time
+            if table.__partition_by__ is not None:
+                await create_future_partitions(connection, table)
+
+            # keep cache invalidation triggers installed
+            if table.__cached__:
+                for sql in generate_cache_trigger_code(table):
+                    await connection.execute(sql)
 
 
 async def async_main() -> int:
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, TypeAlias
+
+from orm import state
+from orm.connections import build_query
+from orm.queries.select import Select, select
+from orm.sql_generation import get_cache_channel
+from orm.tables import get_primary_key_column
+
+if TYPE_CHECKING:
+    from orm.connections import Connection
+    from orm.tables import Table
+
+
+# a full reload of a table (or of every table, if None), or a notification
+# for a table, plus a future for whoever is waiting on the work to be done
+CacheWork: TypeAlias = tuple[
+    "Table | None",
+    "dict[str, Any] | None",
+    "asyncio.Future[None] | None",
+]
+
+
+class TableCache:
+    """\
+    An in-process replica of every table declared with `__cached__ = True`,
+    kept up to date through the triggers installed by migrations.
+
+    async with TableCache(connection) as cache:
+        account_type = cache.get(AccountTypes, 1)
+
+    Notifications & reloads are queued & applied one at a time, in the order
+    they arrived, on the notification connection. This keeps a stale read
+    from overwriting a newer change, and stops a bulk UPDATE from fanning
+    out across the pool.
+
+    If the notification connection drops, the tables are fully
+    reloaded every `reload_interval` seconds until it's back.
+    """
+
+    def __init__(self, connection: Connection, reload_interval: float = 30.0) -> None:
+        self._connection = connection
+        self._reload_interval = reload_interval
+        self._tables = {
+            get_cache_channel(table): table
+            for table in state.TABLE_INSTANCES.values()
+            if table.__cached__
+        }
+        self._rows: dict[str, dict[Any, dict[str, Any]]] = {}
+        # None entries only wake the consumer, e.g. on termination
+        self._work: asyncio.Queue[CacheWork | None] = asyncio.Queue()
+        self._raw_connection: Any = None
+        self._maintain_task: asyncio.Task[None] | None = None
+
+    async def __aenter__(self) -> TableCache:
+        await self._reload(None)
+        self._maintain_task = asyncio.create_task(self._maintain())
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self._maintain_task is not None:
+            self._maintain_task.cancel()
+            await asyncio.gather(self._maintain_task, return_exceptions=True)
+            self._maintain_task = None
+
+        # don't leave anyone waiting on a reload that will never run
+        while not self._work.empty():
+            work = self._work.get_nowait()
+            if work is not None and work[2] is not None:
+                work[2].cancel()
+
+    def get(self, table: Table, primary_key: Any) -> dict[str, Any] | None:
+        return self._rows[table.__tablename__].get(primary_key)
+
+    def all(self, table: Table) -> list[dict[str, Any]]:
+        return list(self._rows[table.__tablename__].values())
+
+    async def wait_for_pending(self) -> None:
+        """Wait until all notifications received so far have been applied."""
+        await self._work.join()
+
+    async def reload(self, table: Table | None = None) -> None:
+        if self._maintain_task is None:
+            await self._reload(table)
+            return
+
+        # NOTE: queued behind any pending notifications, so a reload
+        # can never interleave with the row updates around it
+        done: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._work.put_nowait((table, None, done))
+        await done
+
+    async def _fetch_all(self, query: Select) -> list[dict[str, Any]]:
+        if self._raw_connection is None:
+            return await self._connection.fetch_all(query)
+        recs = await self._raw_connection.fetch(build_query(query))
+        return [dict(rec) for rec in recs]
+
+    async def _reload(self, table: Table | None) -> None:
+        tables = [table] if table is not None else list(self._tables.values())
+        for table in tables:
+            primary_key = table.__primary_key__
+            recs = await self._fetch_all(select([table]).from_table(table))
+            # NOTE: swap the whole table in at once, so readers
+            # never see a partially loaded table
+            self._rows[table.__tablename__] = {rec[primary_key]: rec for rec in recs}
+
+    async def _reload_row(self, table: Table, primary_key: Any) -> None:
+        query = (
+            select([table])
+            .from_table(table)
+            .where([get_primary_key_column(table) == primary_key])
+        )
+        recs = await self._fetch_all(query)
+        if not recs:
+            self._rows[table.__tablename__].pop(primary_key, None)
+        else:
+            self._rows[table.__tablename__][primary_key] = recs[0]
+
+    async def _apply_notification(self, table: Table, payload: dict[str, Any]) -> None:
+        # NOTE: rather than trusting row data in the payload, we re-read the
+        # row; this keeps types consistent with a full load
+        if payload["op"] == "TRUNCATE":
+            await self._reload(table)
+        elif payload["op"] == "DELETE":
+            self._rows[table.__tablename__].pop(payload["key"], None)
+        else:
+            if payload.get("old_key", payload["key"]) != payload["key"]:
+                self._rows[table.__tablename__].pop(payload["old_key"], None)
+            await self._reload_row(table, payload["key"])
+
+    async def _run(self, work: CacheWork) -> None:
+        table, payload, done = work
+        try:
+            if payload is None:
+                await self._reload(table)
+            else:
+                assert table is not None, "notifications are for a table"
+                await self._apply_notification(table, payload)
+        except Exception as exc:
+            if done is not None and not done.done():
+                done.set_exception(exc)
+            raise
+        if done is not None and not done.done():
+            done.set_result(None)
+
+    async def _run_next(self, timeout: float) -> bool:
+        """Run the next queued work, or return False if none arrives in time."""
+        try:
+            work = await asyncio.wait_for(self._work.get(), timeout)
+        except TimeoutError:
+            return False
+        try:
+            if work is not None:
+                await self._run(work)
+        finally:
+            self._work.task_done()
+        return True
+
+    def _on_notification(
+        self,
+        raw_connection: Any,
+        pid: int,
+        channel: str,
+        payload: str,
+    ) -> None:
+        self._work.put_nowait((self._tables[channel], json.loads(payload), None))
+
+    async def _listen(self) -> None:
+        """Listen for & apply notifications until the connection is lost."""
+        async with self._connection.raw_connection() as raw_connection:
+            raw_connection.add_termination_listener(
+                lambda _: self._work.put_nowait(None)
+            )
+            for channel in self._tables:
+                await raw_connection.add_listener(channel, self._on_notification)
+
+            self._raw_connection = raw_connection
+            try:
+                # pick up any changes made while we weren't listening
+                await self._reload(None)
+
+                while not raw_connection.is_closed():
+                    if not await self._run_next(self._reload_interval):
+                        # a half-open connection won't terminate on its own
+                        await raw_connection.execute("SELECT 1", timeout=5.0)
+            finally:
+                self._raw_connection = None
+
+    async def _maintain(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.warning(
+                    "Table cache lost its notification connection",
+                    exc_info=True,
+                )
+
+            # fall back to a full reload while we're not listening,
+            # still serving any queued work from the pool meanwhile
+            deadline = loop.time() + self._reload_interval
+            try:
+                while (remaining := deadline - loop.time()) > 0:
+                    await self._run_next(remaining)
+                await self._reload(None)
+            except Exception:
+                logging.exception("Failed to reload table cache")
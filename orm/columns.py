@@ -121,6 +121,38 @@ class BinaryOperation:  # e.g. "a + b", "accounts.account_id + 1"
         )
 
 
+class AggregateType(Enum):
+    COUNT = "COUNT"
+    SUM = "SUM"
+    MIN = "MIN"
+    MAX = "MAX"
+    AVG = "AVG"
+
+
+class Aggregate:  # e.g. "SUM(payments.amount) AS total_amount"
+    # NOTE: aggregates are only valid in a select list
+    def __init__(
+        self,
+        type: AggregateType,
+        reference: Expression,
+        alias: str | None = None,
+    ) -> None:
+        self._type = type
+        self._reference = reference
+        self._alias = alias
+
+    @property
+    def result_name(self) -> str:
+        # postgres names unaliased aggregate results after the function
+        return self._alias if self._alias is not None else self._type.value.lower()
+
+    def convert_to_sql(self) -> str:
+        sql = f"{self._type.value}({self._reference.convert_to_sql()})"
+        if self._alias is not None:
+            sql += f" AS {self._alias}"
+        return sql
+
+
 class SqlLiteral:  # e.g. "1"
     def __init__(self, value: Any) -> None:
         self._value = value
@@ -136,6 +168,12 @@ class SqlLiteral:  # e.g. "1"
             return f"'{self._value.isoformat()}'"
         elif self._value is None:
             return "NULL"
+        elif isinstance(self._value, list | tuple):
+            return (
+                "("
+                + ", ".join(SqlLiteral(value).convert_to_sql() for value in self._value)
+                + ")"
+            )
         else:
             raise NotImplementedError(
                 f"No implementation for this type: {type(self._value)}"
@@ -213,6 +251,18 @@ class Column:  # e.g. "a.account_id", "accounts.account_id"
     def __floordiv__(self, other: Self | PrimitiveSharedPyTypes) -> BinaryOperation:
         return BinaryOperation(self, other, OperationType.FLOORDIV)
 
+    # NOTE: `in` can't be overloaded to return an expression,
+    # since python coerces the result of __contains__ to a bool
+
+    def in_(self, values: list[PrimitiveSharedPyTypes]) -> BinaryOperation:
+        # "IN ()" is a syntax error in postgres
+        assert values, "in_() needs at least one value"
+        return BinaryOperation(self, SqlLiteral(values), OperationType.IN)
+
+    def not_in(self, values: list[PrimitiveSharedPyTypes]) -> BinaryOperation:
+        assert values, "not_in() needs at least one value"
+        return BinaryOperation(self, SqlLiteral(values), OperationType.NOT_IN)
+
     def convert_to_sql(self) -> str:
         return f"{self._table_name}.{self._column_name}"
 
@@ -237,4 +287,6 @@ class SqlEnum(Column):
     ...
 
 
-Expression: TypeAlias = SqlLiteral | Column | UnaryOperation | BinaryOperation
+Expression: TypeAlias = (
+    SqlLiteral | Column | UnaryOperation | BinaryOperation | Aggregate
+)
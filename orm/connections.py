@@ -1,10 +1,27 @@
 from __future__ import annotations
 
+import asyncio
+import inspect
+import io
+import os
+import zlib
+from contextlib import asynccontextmanager
 from types import TracebackType
-from typing import Any
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncIterator,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Literal,
+    TypeAlias,
+)
 
 import databases
 
+from orm._typing import UNSET, Unset
+from orm.limiters import get_limiter
 from orm.queries.select import Query
 
 
@@ -27,10 +44,99 @@ def build_query(query: Query) -> str:
     return query.convert_to_sql()
 
 
+# a path to write to, a binary file object, or an async writer
+ExportSink: TypeAlias = (
+    str | os.PathLike[str] | BinaryIO | Callable[[bytes], Awaitable[Any]]
+)
+
+
+def get_compressor(compression: Literal["gzip", "zstd"] | None) -> Any:
+    if compression is None:
+        return None
+    elif compression == "gzip":
+        return zlib.compressobj(wbits=31)  # 31 for a gzip container
+    elif compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstd compression requires the zstandard package")
+        return zstandard.ZstdCompressor().compressobj()
+    else:
+        raise NotImplementedError(
+            f"No implementation for this compression: {compression}"
+        )
+
+
+@asynccontextmanager
+async def open_export_sink(
+    sink: ExportSink,
+) -> AsyncIterator[Callable[[bytes], Awaitable[Any]]]:
+    loop = asyncio.get_running_loop()
+
+    # NOTE: file i/o is blocking, so we run it in the default executor
+    if isinstance(sink, str | os.PathLike):
+        file = await loop.run_in_executor(None, open, sink, "wb")
+        try:
+            yield lambda chunk: loop.run_in_executor(None, file.write, chunk)
+        except BaseException:
+            # don't leave a truncated export behind
+            await loop.run_in_executor(None, file.close)
+            await loop.run_in_executor(None, os.remove, sink)
+            raise
+        else:
+            await loop.run_in_executor(None, file.close)
+    elif inspect.iscoroutinefunction(getattr(sink, "write", None)):
+        # e.g. an aiofiles file, which must be awaited on the loop
+        yield sink.write  # type: ignore[union-attr]
+    elif isinstance(sink, io.IOBase):
+        yield lambda chunk: loop.run_in_executor(None, sink.write, chunk)
+    elif inspect.iscoroutinefunction(sink):
+        yield sink
+    else:
+        raise TypeError(
+            f"Can't export to {sink!r}; expected a path, a binary file, "
+            "or an async writer"
+        )
+
+
+@asynccontextmanager
+async def deadline(timeout: float | None, limiter: str | None) -> AsyncIterator[None]:
+    """\
+    Bound a logical query (which may be several statements, e.g. across
+    shards) by a timeout, holding a single slot of the named limiter.
+    """
+    # look the limiter up before starting the clock
+    concurrency_limiter = get_limiter(limiter) if limiter is not None else None
+
+    # NOTE: the deadline includes time spent queued on the limiter.
+    # when it passes, the query is cancelled; asyncpg then sends a
+    # protocol-level CancelRequest so the server stops working on it too
+    async with asyncio.timeout(timeout):
+        if concurrency_limiter is None:
+            yield
+        else:
+            async with concurrency_limiter:
+                yield
+
+
 class Connection:
-    def __init__(self, dsn: str) -> None:
+    def __init__(
+        self,
+        dsn: str,
+        timeout: float | None = None,
+        statement_timeout: float | None = None,
+    ) -> None:
+        options: dict[str, Any] = {}
+        if statement_timeout is not None:
+            # server-side backstop; postgres aborts any statement
+            # running longer than this, even if the client is gone
+            options["server_settings"] = {
+                "statement_timeout": str(int(statement_timeout * 1000)),
+            }
+
         # TODO: eventually we may want to use asyncpg directly
-        self._connection = databases.Database(dsn)
+        self._connection = databases.Database(dsn, **options)
+        self._timeout = timeout
 
     async def __aenter__(self) -> Connection:
         await self._connection.connect()
@@ -44,32 +150,229 @@ class Connection:
     ) -> None:
         await self._connection.disconnect()
 
-    async def fetch_one(self, query: Query | str) -> dict[str, Any] | None:
+    def transaction(self) -> databases.core.Transaction:
+        return self._connection.transaction()
+
+    def batch(
+        self,
+        timeout: float | None | Unset = UNSET,
+        limiter: str | None = None,
+    ) -> Batch:
+        return Batch(self, timeout=timeout, limiter=limiter)
+
+    @asynccontextmanager
+    async def raw_connection(self) -> AsyncIterator[Any]:
+        """Acquire the underlying asyncpg connection."""
+        async with self._connection.connection() as connection:
+            yield connection.raw_connection
+
+    def _deadline(
+        self,
+        timeout: float | None | Unset,
+        limiter: str | None,
+    ) -> AsyncContextManager[None]:
+        if isinstance(timeout, Unset):
+            timeout = self._timeout
+        return deadline(timeout, limiter)
+
+    async def fetch_one(
+        self,
+        query: Query | str,
+        values: dict[str, Any] | None = None,
+        timeout: float | None | Unset = UNSET,
+        limiter: str | None = None,
+    ) -> dict[str, Any] | None:
         if isinstance(query, Query):
             query = build_query(query)
 
-        rec = await self._connection.fetch_one(query)
+        async with self._deadline(timeout, limiter):
+            rec = await self._connection.fetch_one(query, values)
 
         # TODO: return an object of the result
         return dict(rec._mapping) if rec is not None else None
 
-    async def fetch_all(self, query: Query | str) -> list[dict[str, Any]]:
+    async def fetch_all(
+        self,
+        query: Query | str,
+        values: dict[str, Any] | None = None,
+        timeout: float | None | Unset = UNSET,
+        limiter: str | None = None,
+    ) -> list[dict[str, Any]]:
         if isinstance(query, Query):
             query = build_query(query)
 
-        recs = await self._connection.fetch_all(query)
+        async with self._deadline(timeout, limiter):
+            recs = await self._connection.fetch_all(query, values)
+
         return [dict(rec._mapping) for rec in recs]
 
-    async def execute(self, query: Query | str) -> None:
+    async def execute(
+        self,
+        query: Query | str,
+        values: dict[str, Any] | None = None,
+        timeout: float | None | Unset = UNSET,
+        limiter: str | None = None,
+    ) -> None:
         if isinstance(query, Query):
             query = build_query(query)
 
-        await self._connection.execute(query)
+        async with self._deadline(timeout, limiter):
+            await self._connection.execute(query, values)
+
+        return None
+
+    async def execute_many(
+        self,
+        query: Query | str,
+        values: list[Any],
+        timeout: float | None | Unset = UNSET,
+        limiter: str | None = None,
+    ) -> None:
+        if isinstance(query, Query):
+            query = build_query(query)
+
+        async with self._deadline(timeout, limiter):
+            await self._connection.execute_many(query, values)
+
         return None
 
-    async def execute_many(self, query: Query | str, values: list[Any]) -> None:
+    async def export(
+        self,
+        query: Query | str,
+        sink: ExportSink,
+        format: Literal["csv", "binary"] = "csv",
+        compression: Literal["gzip", "zstd"] | None = None,
+        header: bool = True,
+        max_buffered_chunks: int = 16,
+        timeout: float | None | Unset = UNSET,
+        limiter: str | None = None,
+    ) -> None:
+        """\
+        Stream the results of a query into a sink with COPY (...) TO STDOUT,
+        without materializing the rows in memory.
+
+        At most `max_buffered_chunks` chunks are held between the database
+        & the sink; beyond that, reading from the server is paused.
+        """
         if isinstance(query, Query):
             query = build_query(query)
 
-        await self._connection.execute_many(query, values)
+        copy_options: dict[str, Any] = {"format": format}
+        if format == "csv":
+            copy_options["header"] = header
+
+        compressor = get_compressor(compression)
+        chunks: asyncio.Queue[bytes | None] = asyncio.Queue(max_buffered_chunks)
+        loop = asyncio.get_running_loop()
+
+        async def write_chunks(write: Callable[[bytes], Awaitable[Any]]) -> None:
+            while (chunk := await chunks.get()) is not None:
+                if compressor is not None:
+                    # compression is cpu-bound; keep it off the event loop
+                    chunk = await loop.run_in_executor(
+                        None,
+                        compressor.compress,
+                        chunk,
+                    )
+                if chunk:
+                    await write(chunk)
+
+            if compressor is not None:
+                await write(await loop.run_in_executor(None, compressor.flush))
+
+        async def read_chunks(raw_connection: Any) -> None:
+            # asyncpg awaits our callback for each chunk, so
+            # a full queue applies backpressure to the server
+            await raw_connection.copy_from_query(
+                query,
+                output=chunks.put,
+                **copy_options,
+            )
+            await chunks.put(None)
+
+        async with (
+            self._deadline(timeout, limiter),
+            self.raw_connection() as raw_connection,
+            open_export_sink(sink) as write,
+        ):
+            try:
+                async with asyncio.TaskGroup() as task_group:
+                    task_group.create_task(read_chunks(raw_connection))
+                    task_group.create_task(write_chunks(write))
+            except ExceptionGroup as exc_group:
+                # surface the original error, rather than the group
+                raise exc_group.exceptions[0]
+
         return None
+
+
+class Batch:
+    """\
+    Collects independent queries & runs them together, so that N queries
+    cost roughly one round trip rather than N.
+
+    async with connection.batch() as batch:
+        batch.fetch_all(accounts_query)
+        batch.fetch_one(payments_query)
+
+    accounts, payment = batch.results
+
+    NOTE: asyncpg doesn't expose protocol pipelining, so the queries are
+    instead run concurrently, each on its own connection from the pool.
+    This also means they don't see the caller's uncommitted transaction.
+
+    The batch as a whole takes a single slot of its limiter,
+    & its timeout bounds all of its queries together.
+    """
+
+    def __init__(
+        self,
+        connection: Connection,
+        timeout: float | None | Unset = UNSET,
+        limiter: str | None = None,
+    ) -> None:
+        self._connection = connection
+        self._timeout = timeout
+        self._limiter = limiter
+        self._queries: list[tuple[Callable[..., Awaitable[Any]], Query | str, Any]] = []
+        self.results: list[Any] = []
+
+    async def __aenter__(self) -> Batch:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            await self.run()
+        else:
+            self._queries.clear()
+
+    def fetch_one(
+        self,
+        query: Query | str,
+        values: dict[str, Any] | None = None,
+    ) -> None:
+        self._queries.append((self._connection.fetch_one, query, values))
+
+    def fetch_all(
+        self,
+        query: Query | str,
+        values: dict[str, Any] | None = None,
+    ) -> None:
+        self._queries.append((self._connection.fetch_all, query, values))
+
+    async def run(self) -> list[Any]:
+        """Run the collected queries, returning their results in order."""
+        queries, self._queries = self._queries, []
+        async with self._connection._deadline(self._timeout, self._limiter):
+            self.results = await asyncio.gather(
+                *(
+                    fetch(query, values, timeout=None)
+                    for fetch, query, values in queries
+                )
+            )
+        return self.results
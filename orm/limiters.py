@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import asyncio
+from types import TracebackType
+
+from orm import state
+
+
+class ConcurrencyLimitExceeded(Exception):
+    pass
+
+
+class ConcurrencyLimiter:
+    """\
+    Caps how many queries of a class (e.g. "analytics") may run at once,
+    so expensive queries can't starve latency-sensitive ones of connections.
+
+    Once `max_concurrency` queries are running, further queries queue;
+    once `max_queued` are waiting, further queries are shed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queued: int | None = None,
+    ) -> None:
+        self._name = name
+        self._max_concurrency = max_concurrency
+        self._max_queued = max_queued
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._queued = 0
+
+    async def __aenter__(self) -> ConcurrencyLimiter:
+        if (
+            self._semaphore.locked()
+            and self._max_queued is not None
+            and self._queued >= self._max_queued
+        ):
+            raise ConcurrencyLimitExceeded(
+                f"{self._name} has {self._max_concurrency} queries running "
+                f"and {self._queued} queued"
+            )
+
+        self._queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._queued -= 1
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._semaphore.release()
+
+
+def register_limiter(
+    name: str,
+    max_concurrency: int,
+    max_queued: int | None = None,
+) -> ConcurrencyLimiter:
+    limiter = ConcurrencyLimiter(name, max_concurrency, max_queued)
+    state.LIMITERS[name] = limiter
+    return limiter
+
+
+def get_limiter(name: str) -> ConcurrencyLimiter:
+    limiter = state.LIMITERS.get(name)
+    if limiter is None:
+        raise ValueError(f"No concurrency limiter registered named {name!r}")
+    return limiter
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Any
+
+from orm.sql_generation import (
+    get_catalog_type_from_column,
+    get_sql_default_from_column,
+    get_sql_type_from_column,
+)
+
+if TYPE_CHECKING:
+    from orm.columns import Column
+    from orm.connections import Connection
+    from orm.tables import Table
+
+
+# NOTE: postgres reports defaults with a trailing cast,
+# e.g. "'foo'::text" or "NULL::timestamp without time zone"
+TRAILING_CASTS_REGEX = re.compile(r"(::[a-z ]+(\[\])?)+$")
+
+
+class MigrationStep:
+    def __init__(self, sql: str, blocking_reason: str | None = None) -> None:
+        self.sql = sql
+        # set when running the step on a large table would rewrite
+        # it or hold an ACCESS EXCLUSIVE lock for a long time
+        self.blocking_reason = blocking_reason
+
+    @property
+    def is_blocking(self) -> bool:
+        return self.blocking_reason is not None
+
+    def __repr__(self) -> str:
+        return (
+            f"MigrationStep(sql={self.sql!r}, "
+            f"blocking_reason={self.blocking_reason!r})"
+        )
+
+
+async def fetch_live_columns(
+    connection: Connection,
+    table_name: str,
+) -> dict[str, dict[str, Any]]:
+    """\
+    Introspect the live catalog for a table's columns, keyed by column name.
+
+    An empty dict is returned if the table does not exist.
+    """
+    recs = await connection.fetch_all(
+        """\
+        SELECT column_name, data_type, is_nullable, column_default
+        FROM information_schema.columns
+        WHERE table_schema = current_schema()
+        AND table_name = :table_name
+        ORDER BY ordinal_position
+        """,
+        {"table_name": table_name},
+    )
+    return {rec["column_name"]: rec for rec in recs}
+
+
+def normalize_sql_default(default: str | None) -> str | None:
+    if default is None:
+        return None
+
+    default = TRAILING_CASTS_REGEX.sub("", default.strip())
+    if default.upper() == "NULL":
+        # "DEFAULT NULL" is equivalent to having no default at all
+        return None
+    if default.startswith("'"):
+        # NOTE: postgres quotes negative numbers, e.g. "'-1'::integer"
+        unquoted = default[1:-1]
+        try:
+            float(unquoted)
+        except ValueError:
+            return default
+        return unquoted
+    return default.lower()  # e.g. "NOW()" vs. "now()"
+
+
+def generate_alter_migration_steps(
+    table: Table,
+    live_columns: dict[str, dict[str, Any]],
+) -> list[MigrationStep]:
+    """\
+    A function to generate the minimal ALTER TABLE steps required to bring
+    a table's live columns in line with its declared columns.
+
+    ALTER TABLE payments ADD COLUMN currency TEXT NULL;
+
+    ALTER TABLE payments DROP CONSTRAINT IF EXISTS payments_amount_not_null;
+    ALTER TABLE payments ADD CONSTRAINT payments_amount_not_null
+        CHECK (amount IS NOT NULL) NOT VALID;
+    ALTER TABLE payments VALIDATE CONSTRAINT payments_amount_not_null;
+    ALTER TABLE payments ALTER COLUMN amount SET NOT NULL;
+    ALTER TABLE payments DROP CONSTRAINT payments_amount_not_null;
+    """
+    steps: list[MigrationStep] = []
+    table_name = table.__tablename__
+    declared_column_names = {column._column_name for column in table.__columns__}
+
+    for column in table.__columns__:
+        column_name = column._column_name
+        declared_default = get_sql_default_from_column(column)
+
+        live_column = live_columns.get(column_name)
+        if live_column is None:
+            steps.append(generate_add_column_step(table, column))
+            continue
+
+        # column type changes
+        catalog_type = get_catalog_type_from_column(column)
+        if live_column["data_type"] != catalog_type:
+            column_type = get_sql_type_from_column(column)
+            steps.append(
+                MigrationStep(
+                    f"ALTER TABLE {table_name} ALTER COLUMN {column_name} "
+                    f"TYPE {column_type} USING {column_name}::{column_type}",
+                    blocking_reason=(
+                        f"changing {column_name} from {live_column['data_type']} "
+                        f"to {catalog_type} rewrites the table under an "
+                        "ACCESS EXCLUSIVE lock"
+                    ),
+                )
+            )
+
+        # primary keys are backed by a sequence default (SERIAL),
+        # which we don't declare on the column itself
+        if not column._primary_key:
+            live_default = normalize_sql_default(live_column["column_default"])
+            if normalize_sql_default(declared_default) != live_default:
+                if declared_default is None:
+                    sql = (
+                        f"ALTER TABLE {table_name} ALTER COLUMN {column_name} "
+                        "DROP DEFAULT"
+                    )
+                else:
+                    sql = (
+                        f"ALTER TABLE {table_name} ALTER COLUMN {column_name} "
+                        f"SET DEFAULT {declared_default}"
+                    )
+                steps.append(MigrationStep(sql))
+
+        # nullability changes
+        live_nullable = live_column["is_nullable"] == "YES"
+        if column._nullable and not live_nullable:
+            steps.append(
+                MigrationStep(
+                    f"ALTER TABLE {table_name} ALTER COLUMN {column_name} "
+                    "DROP NOT NULL"
+                )
+            )
+        elif not column._nullable and live_nullable:
+            steps.extend(generate_set_not_null_steps(table, column))
+
+    for column_name in live_columns:
+        if column_name not in declared_column_names:
+            # NOTE: a renamed or removed attribute looks just like a column
+            # to drop, so drops are never run automatically
+            steps.append(
+                MigrationStep(
+                    f"ALTER TABLE {table_name} DROP COLUMN {column_name}",
+                    blocking_reason=(
+                        f"dropping {column_name} destroys its data; drop it "
+                        "manually once nothing reads it"
+                    ),
+                )
+            )
+
+    return steps
+
+
+def generate_add_column_step(table: Table, column: Column) -> MigrationStep:
+    table_name = table.__tablename__
+    column_name = column._column_name
+
+    if column._primary_key:
+        # SERIAL has a volatile default (nextval), so every
+        # existing row must be written, plus the index built
+        return MigrationStep(
+            f"ALTER TABLE {table_name} ADD COLUMN {column_name} SERIAL PRIMARY KEY",
+            blocking_reason=(
+                f"adding primary key {column_name} rewrites the table and builds "
+                "its index under an ACCESS EXCLUSIVE lock"
+            ),
+        )
+
+    column_type = get_sql_type_from_column(column)
+    nullable = "NULL" if column._nullable else "NOT NULL"
+    sql = f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}"
+    sql += f" {nullable}"
+
+    default = get_sql_default_from_column(column)
+    if default is not None:
+        # NOTE: since postgres 11, constant & stable defaults (incl. NOW())
+        # are stored in the catalog rather than written to each row
+        sql += f" DEFAULT {default}"
+
+    blocking_reason = None
+    if not column._nullable and normalize_sql_default(default) is None:
+        blocking_reason = (
+            f"adding NOT NULL column {column_name} without a default fails if the "
+            "table has rows; add it as NULL, backfill, then SET NOT NULL"
+        )
+
+    return MigrationStep(sql, blocking_reason=blocking_reason)
+
+
+def generate_set_not_null_steps(table: Table, column: Column) -> list[MigrationStep]:
+    # a plain SET NOT NULL scans the whole table under an ACCESS EXCLUSIVE lock.
+    # instead, add an unvalidated check constraint (brief lock), validate it
+    # (SHARE UPDATE EXCLUSIVE; reads & writes continue), after which postgres 12+
+    # uses the valid constraint to skip the scan when setting NOT NULL.
+    table_name = table.__tablename__
+    column_name = column._column_name
+    constraint_name = f"{table_name}_{column_name}_not_null"
+    return [
+        # NOTE: if a previous run failed to validate (e.g. NULLs remained),
+        # the NOT VALID constraint was left behind; re-adding it would fail
+        MigrationStep(
+            f"ALTER TABLE {table_name} DROP CONSTRAINT IF EXISTS {constraint_name}"
+        ),
+        MigrationStep(
+            f"ALTER TABLE {table_name} ADD CONSTRAINT {constraint_name} "
+            f"CHECK ({column_name} IS NOT NULL) NOT VALID"
+        ),
+        MigrationStep(
+            f"ALTER TABLE {table_name} VALIDATE CONSTRAINT {constraint_name}"
+        ),
+        MigrationStep(
+            f"ALTER TABLE {table_name} ALTER COLUMN {column_name} SET NOT NULL"
+        ),
+        MigrationStep(f"ALTER TABLE {table_name} DROP CONSTRAINT {constraint_name}"),
+    ]
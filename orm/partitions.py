@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import TYPE_CHECKING
+
+from orm.columns import SqlLiteral
+
+if TYPE_CHECKING:
+    from orm.columns import Column
+    from orm.connections import Connection
+    from orm.tables import Table
+
+
+PARTITION_NAME_DATE_FORMAT = "%Y%m%d"
+
+
+class PartitionInterval(Enum):
+    DAY = "DAY"
+    WEEK = "WEEK"
+    MONTH = "MONTH"
+    YEAR = "YEAR"
+
+    def floor(self, dt: datetime) -> datetime:
+        """Return the start of the interval containing `dt`."""
+        dt = dt.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+        if self is PartitionInterval.DAY:
+            return dt
+        elif self is PartitionInterval.WEEK:
+            return dt - timedelta(days=dt.weekday())
+        elif self is PartitionInterval.MONTH:
+            return dt.replace(day=1)
+        elif self is PartitionInterval.YEAR:
+            return dt.replace(month=1, day=1)
+        else:
+            raise NotImplementedError(f"No implementation for this interval: {self}")
+
+    def shift(self, dt: datetime, n: int) -> datetime:
+        """Move an interval boundary `n` intervals forwards (or backwards)."""
+        if self is PartitionInterval.DAY:
+            return dt + timedelta(days=n)
+        elif self is PartitionInterval.WEEK:
+            return dt + timedelta(weeks=n)
+        elif self is PartitionInterval.MONTH:
+            year, month = divmod(dt.month - 1 + n, 12)
+            return dt.replace(year=dt.year + year, month=month + 1)
+        elif self is PartitionInterval.YEAR:
+            return dt.replace(year=dt.year + n)
+        else:
+            raise NotImplementedError(f"No implementation for this interval: {self}")
+
+
+class RangePartition:
+    """\
+    Declares a table as PARTITION BY RANGE over a timestamp column,
+    with one partition per interval.
+
+    @table_instance
+    class Payments(Table):
+        ...
+        created_at = DateTime("payments", "created_at", default=SqlFunction.NOW)
+
+        __partition_by__ = RangePartition(created_at, PartitionInterval.MONTH)
+    """
+
+    def __init__(
+        self,
+        column: Column,
+        interval: PartitionInterval,
+        premake: int = 3,
+    ) -> None:
+        self._column = column
+        self._interval = interval
+        # number of partitions to keep created ahead of the current one
+        self._premake = premake
+
+
+def get_partition_name(table: Table, lower_bound: datetime) -> str:
+    return f"{table.__tablename__}_p{lower_bound.strftime(PARTITION_NAME_DATE_FORMAT)}"
+
+
+def generate_create_partition_code(table: Table, lower_bound: datetime) -> str:
+    """\
+    A function to generate the code to create a single partition of a table.
+
+    CREATE TABLE IF NOT EXISTS payments_p20261001 PARTITION OF payments
+    FOR VALUES FROM ('2026-10-01T00:00:00') TO ('2026-11-01T00:00:00');
+    """
+    partition_by = table.__partition_by__
+    assert partition_by is not None, f"{table.__tablename__} is not partitioned"
+
+    upper_bound = partition_by._interval.shift(lower_bound, 1)
+    return (
+        "CREATE TABLE IF NOT EXISTS "
+        f"{get_partition_name(table, lower_bound)} "
+        f"PARTITION OF {table.__tablename__}\n"
+        f"FOR VALUES FROM ({SqlLiteral(lower_bound).convert_to_sql()}) "
+        f"TO ({SqlLiteral(upper_bound).convert_to_sql()});"
+    )
+
+
+async def fetch_is_partitioned(connection: Connection, table: Table) -> bool:
+    rec = await connection.fetch_one(
+        """\
+        SELECT 1
+        FROM pg_partitioned_table pt
+        JOIN pg_class c ON c.oid = pt.partrelid
+        WHERE c.relname = :table_name
+        AND c.relnamespace = current_schema()::regnamespace
+        """,
+        {"table_name": table.__tablename__},
+    )
+    return rec is not None
+
+
+async def fetch_partitions(connection: Connection, table: Table) -> dict[str, datetime]:
+    """\
+    Fetch the partitions currently attached to a table, mapped
+    to their lower bounds (as encoded in the partition's name).
+
+    Partitions not created by us are ignored.
+    """
+    recs = await connection.fetch_all(
+        """\
+        SELECT child.relname AS partition_name
+        FROM pg_inherits i
+        JOIN pg_class parent ON parent.oid = i.inhparent
+        JOIN pg_class child ON child.oid = i.inhrelid
+        WHERE parent.relname = :table_name
+        AND parent.relnamespace = current_schema()::regnamespace
+        """,
+        {"table_name": table.__tablename__},
+    )
+
+    prefix = f"{table.__tablename__}_p"
+    partitions: dict[str, datetime] = {}
+    for rec in recs:
+        partition_name = rec["partition_name"]
+        if not partition_name.startswith(prefix):
+            continue
+        try:
+            partitions[partition_name] = datetime.strptime(
+                partition_name.removeprefix(prefix),
+                PARTITION_NAME_DATE_FORMAT,
+            )
+        except ValueError:
+            continue
+    return partitions
+
+
+async def create_future_partitions(
+    connection: Connection,
+    table: Table,
+    now: datetime | None = None,
+) -> list[str]:
+    """\
+    Ensure the partition for the current interval, and `premake`
+    partitions after it, exist. Returns the partitions created.
+    """
+    partition_by = table.__partition_by__
+    assert partition_by is not None, f"{table.__tablename__} is not partitioned"
+
+    if now is None:
+        now = datetime.now()
+
+    existing_partitions = await fetch_partitions(connection, table)
+
+    created: list[str] = []
+    lower_bound = partition_by._interval.floor(now)
+    for _ in range(partition_by._premake + 1):
+        partition_name = get_partition_name(table, lower_bound)
+        if partition_name not in existing_partitions:
+            await connection.execute(generate_create_partition_code(table, lower_bound))
+            created.append(partition_name)
+        lower_bound = partition_by._interval.shift(lower_bound, 1)
+
+    return created
+
+
+async def remove_old_partitions(
+    connection: Connection,
+    table: Table,
+    retain: int,
+    now: datetime | None = None,
+    drop: bool = True,
+) -> list[str]:
+    """\
+    Detach (and by default, drop) partitions which lie entirely more than
+    `retain` intervals before the current one. Returns the partitions removed.
+
+    Retention is then a catalog operation, rather than a large DELETE.
+    """
+    partition_by = table.__partition_by__
+    assert partition_by is not None, f"{table.__tablename__} is not partitioned"
+
+    if now is None:
+        now = datetime.now()
+
+    interval = partition_by._interval
+    cutoff = interval.shift(interval.floor(now), -retain)
+
+    removed: list[str] = []
+    partitions = await fetch_partitions(connection, table)
+    for partition_name, lower_bound in sorted(partitions.items(), key=lambda p: p[1]):
+        if interval.shift(lower_bound, 1) > cutoff:
+            continue
+
+        # NOTE: CONCURRENTLY (postgres 14+) avoids holding an ACCESS EXCLUSIVE
+        # lock on the parent table, but can't run inside a transaction block
+        await connection.execute(
+            f"ALTER TABLE {table.__tablename__} "
+            f"DETACH PARTITION {partition_name} CONCURRENTLY"
+        )
+        if drop:
+            await connection.execute(f"DROP TABLE {partition_name}")
+        removed.append(partition_name)
+
+    return removed
@@ -1,9 +1,40 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from orm.queries import Query
+from orm.tables import Table
+
+if TYPE_CHECKING:
+    from orm.columns import Expression
 
 
 class Delete(Query):
-    ...
+    def __init__(self) -> None:
+        self._from_table: Table | None = None
+        self._conditions: list[Expression] = []
+        super().__init__()
+
+    def from_table(self, table: Table) -> Delete:
+        self._from_table = table
+        return self
+
+    def where(self, conditions: list[Expression]) -> Delete:
+        self._conditions.extend(conditions)
+        return self
+
+    def convert_to_sql(self) -> str:
+        assert self._from_table is not None, "from_table() must be set for delete()"
+
+        sql = "DELETE FROM "
+        sql += self._from_table.__tablename__
+        if self._conditions:
+            sql += " WHERE "
+            sql += " AND ".join(
+                condition.convert_to_sql() for condition in self._conditions
+            )
+        return sql
 
 
 def delete() -> Delete:
-    ...
+    return Delete()
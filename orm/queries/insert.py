@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from orm.columns import SqlLiteral
 from orm.queries import Join, JoinType, Order, Query
@@ -14,7 +14,7 @@ if TYPE_CHECKING:
 class Insert(Query):
     def __init__(self) -> None:
         self._into_table: Table | None = None
-        self._values: list[tuple[Column, SqlLiteral]] = []
+        self._rows: list[list[tuple[Column, SqlLiteral]]] = []
         # TODO: RETURNING
         super().__init__()
 
@@ -22,21 +22,31 @@ class Insert(Query):
         self._into_table = table
         return self
 
-    def values(self, values: list[tuple[Column, str]]) -> Insert:
+    # NOTE: each call adds a row; all rows must set the same columns
+    def values(self, values: list[tuple[Column, Any]]) -> Insert:
         # TODO: should these ALWAYS be sql literals? i think no
-        self._values = [(column, SqlLiteral(value)) for column, value in values]
+        self._rows.append([(column, SqlLiteral(value)) for column, value in values])
         return self
 
     def convert_to_sql(self) -> str:
         assert self._into_table is not None, "into_table() must be set for insert()"
+        assert self._rows, "values() must be set for insert()"
+
+        column_names = [column._column_name for column, _ in self._rows[0]]
+        assert all(
+            [column._column_name for column, _ in row] == column_names
+            for row in self._rows
+        ), "all rows must set the same columns for insert()"
 
         sql = "INSERT INTO "
         sql += self._into_table.__tablename__
         sql += " ("
-        sql += ", ".join([column._column_name for column, _ in self._values])
-        sql += ") VALUES ("
-        sql += ", ".join([value.convert_to_sql() for _, value in self._values])
-        sql += ")"
+        sql += ", ".join(column_names)
+        sql += ") VALUES "
+        sql += ", ".join(
+            "(" + ", ".join([value.convert_to_sql() for _, value in row]) + ")"
+            for row in self._rows
+        )
         return sql
 
 
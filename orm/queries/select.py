@@ -87,6 +87,9 @@ class Select(Query):
             query += " AND ".join(
                 condition.convert_to_sql() for condition in self._conditions
             )
+        if self._order_by is not None:
+            column, order = self._order_by
+            query += f" ORDER BY {column.convert_to_sql()} {order.value}"
         if self._offset is not None:
             query += f" OFFSET {self._offset}"
         if self._limit is not None:
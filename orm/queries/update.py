@@ -1,9 +1,131 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from orm.columns import SqlLiteral
 from orm.queries import Query
+from orm.sql_generation import get_sql_type_from_column
+from orm.tables import Table
+
+if TYPE_CHECKING:
+    from orm.columns import Column, Expression
 
 
 class Update(Query):
-    ...
+    def __init__(self) -> None:
+        self._table: Table | None = None
+        self._values: list[tuple[Column, SqlLiteral]] = []
+        self._conditions: list[Expression] = []
+        super().__init__()
+
+    def table(self, table: Table) -> Update:
+        self._table = table
+        return self
+
+    def set(self, values: list[tuple[Column, Any]]) -> Update:
+        self._values.extend((column, SqlLiteral(value)) for column, value in values)
+        return self
+
+    def where(self, conditions: list[Expression]) -> Update:
+        self._conditions.extend(conditions)
+        return self
+
+    def convert_to_sql(self) -> str:
+        assert self._table is not None, "table() must be set for update()"
+        assert self._values, "set() must be set for update()"
+
+        sql = "UPDATE "
+        sql += self._table.__tablename__
+        sql += " SET "
+        sql += ", ".join(
+            f"{column._column_name} = {value.convert_to_sql()}"
+            for column, value in self._values
+        )
+        if self._conditions:
+            sql += " WHERE "
+            sql += " AND ".join(
+                condition.convert_to_sql() for condition in self._conditions
+            )
+        return sql
+
+
+class BulkUpdate(Query):
+    """\
+    Updates many rows, each with its own values, in a single statement.
+
+    UPDATE payments SET amount = v.amount::FLOAT
+    FROM (VALUES (1, 5.0), (2, 7.5)) AS v (payment_id, amount)
+    WHERE payments.payment_id = v.payment_id
+    """
+
+    def __init__(self) -> None:
+        self._table: Table | None = None
+        self._key_column: Column | None = None
+        self._rows: list[tuple[SqlLiteral, list[tuple[Column, SqlLiteral]]]] = []
+        super().__init__()
+
+    def table(self, table: Table) -> BulkUpdate:
+        self._table = table
+        return self
+
+    def key(self, column: Column) -> BulkUpdate:
+        self._key_column = column
+        return self
+
+    # NOTE: each call adds a row; all rows must set the same columns
+    def values(self, key: Any, values: list[tuple[Column, Any]]) -> BulkUpdate:
+        self._rows.append(
+            (
+                SqlLiteral(key),
+                [(column, SqlLiteral(value)) for column, value in values],
+            )
+        )
+        return self
+
+    def convert_to_sql(self) -> str:
+        assert self._table is not None, "table() must be set for bulk_update()"
+        assert self._key_column is not None, "key() must be set for bulk_update()"
+        assert self._rows, "values() must be set for bulk_update()"
+
+        columns = [column for column, _ in self._rows[0][1]]
+        column_names = [column._column_name for column in columns]
+        assert all(
+            [column._column_name for column, _ in values] == column_names
+            for _, values in self._rows
+        ), "all rows must set the same columns for bulk_update()"
+
+        table_name = self._table.__tablename__
+        key_name = self._key_column._column_name
+
+        sql = "UPDATE "
+        sql += table_name
+        sql += " SET "
+        # NOTE: VALUES columns are typed from their literals (e.g. strings
+        # as text), so we cast them back to the column's type
+        sql += ", ".join(
+            f"{column._column_name} = "
+            f"v.{column._column_name}::{get_sql_type_from_column(column)}"
+            for column in columns
+        )
+        sql += " FROM (VALUES "
+        sql += ", ".join(
+            "("
+            + ", ".join(
+                [key.convert_to_sql()] + [value.convert_to_sql() for _, value in values]
+            )
+            + ")"
+            for key, values in self._rows
+        )
+        sql += ") AS v ("
+        sql += ", ".join([key_name] + column_names)
+        sql += ")"
+        sql += f" WHERE {table_name}.{key_name} = v.{key_name}"
+        return sql
 
 
 def update() -> Update:
-    ...
+    return Update()
+
+
+def bulk_update() -> BulkUpdate:
+    return BulkUpdate()
@@ -0,0 +1,412 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import copy
+import heapq
+import itertools
+import zlib
+from types import TracebackType
+from typing import Any, AsyncContextManager, Callable, TypeAlias
+
+from orm._typing import UNSET, Unset
+from orm.columns import (
+    Aggregate,
+    AggregateType,
+    BinaryOperation,
+    Column,
+    OperationType,
+    SqlLiteral,
+)
+from orm.connections import Connection, deadline
+from orm.queries import Order, Query
+from orm.queries.delete import Delete
+from orm.queries.insert import Insert, insert
+from orm.queries.select import Select
+from orm.queries.update import Update
+
+# maps a shard key value & the number of shards to a shard index
+ShardFunction: TypeAlias = Callable[[Any, int], int]
+
+# the name each shard returns the ORDER BY value under, for merging
+SHARD_ORDER_KEY = "_shard_order_key"
+
+
+def hash_shard_function(value: Any, shard_count: int) -> int:
+    # NOTE: python's hash() is salted per-process for strings,
+    # so we need a stable hash for all processes to agree
+    return zlib.crc32(str(value).encode()) % shard_count
+
+
+class RangeShardFunction:
+    """\
+    Maps shard key values to shards by range; `boundaries` are the
+    (sorted) lowest values held by each shard after the first.
+
+    RangeShardFunction([1_000_000, 2_000_000])
+    # shard 0: < 1_000_000, shard 1: < 2_000_000, shard 2: the rest
+    """
+
+    def __init__(self, boundaries: list[Any]) -> None:
+        self._boundaries = boundaries
+
+    def __call__(self, value: Any, shard_count: int) -> int:
+        assert len(self._boundaries) == shard_count - 1, "one boundary per shard"
+        return bisect.bisect_right(self._boundaries, value)
+
+
+def find_shard_key_value(query: Query, shard_key: str) -> Any | Unset:
+    """\
+    Find the value a query pins the shard key to, if any.
+
+    e.g. "WHERE payments.account_id = 1" or "INSERT ... (account_id) VALUES (1)"
+    """
+    if isinstance(query, Insert):
+        # NOTE: a multi-row insert is only pinned if every row is on one shard
+        values = {
+            value._value
+            for row in query._rows
+            for column, value in row
+            if column._column_name == shard_key
+        }
+        return values.pop() if len(values) == 1 else UNSET
+
+    if isinstance(query, Select | Update | Delete):
+        for condition in query._conditions:
+            if not (
+                isinstance(condition, BinaryOperation)
+                and condition._operation is OperationType.EQ
+            ):
+                continue
+
+            left, right = condition._left_reference, condition._right_reference
+            if isinstance(left, SqlLiteral):
+                left, right = right, left
+            if (
+                isinstance(left, Column)
+                and left._column_name == shard_key
+                and isinstance(right, SqlLiteral)
+            ):
+                return right._value
+
+    return UNSET
+
+
+class ShardOrderKey:  # e.g. "payments.created_at AS _shard_order_key"
+    def __init__(self, column: Column) -> None:
+        self._column = column
+
+    def convert_to_sql(self) -> str:
+        return f"{self._column.convert_to_sql()} AS {SHARD_ORDER_KEY}"
+
+
+def get_shard_aggregates(expressions: list[Aggregate]) -> list[Aggregate]:
+    """\
+    Rewrite aggregates into ones each shard can compute & which can then be
+    combined; AVG(x) becomes SUM(x) & COUNT(x).
+    """
+    shard_expressions: list[Aggregate] = []
+    for expression in expressions:
+        if expression._type is AggregateType.AVG:
+            shard_expressions.append(
+                Aggregate(
+                    AggregateType.SUM,
+                    expression._reference,
+                    alias=f"{expression.result_name}_sum",
+                )
+            )
+            shard_expressions.append(
+                Aggregate(
+                    AggregateType.COUNT,
+                    expression._reference,
+                    alias=f"{expression.result_name}_count",
+                )
+            )
+        else:
+            shard_expressions.append(expression)
+    return shard_expressions
+
+
+def combine_aggregates(
+    expressions: list[Aggregate],
+    recs: list[dict[str, Any]],
+) -> dict[str, Any]:
+    """Combine each shard's results for `get_shard_aggregates(expressions)`."""
+
+    def non_null_values(result_name: str) -> list[Any]:
+        return [rec[result_name] for rec in recs if rec[result_name] is not None]
+
+    combined: dict[str, Any] = {}
+    for expression in expressions:
+        name = expression.result_name
+        if expression._type is AggregateType.COUNT:
+            result = sum(non_null_values(name))
+        elif expression._type is AggregateType.SUM:
+            values = non_null_values(name)
+            result = sum(values) if values else None
+        elif expression._type is AggregateType.MIN:
+            result = min(non_null_values(name), default=None)
+        elif expression._type is AggregateType.MAX:
+            result = max(non_null_values(name), default=None)
+        elif expression._type is AggregateType.AVG:
+            count = sum(non_null_values(f"{name}_count"))
+            total = sum(non_null_values(f"{name}_sum"))
+            result = total / count if count else None
+        else:
+            raise NotImplementedError(
+                f"{expression._type.value} can't be combined across shards"
+            )
+        combined[name] = result
+    return combined
+
+
+def merge_shard_results(
+    results: list[list[dict[str, Any]]],
+    order: Order | None,
+    offset: int,
+    limit: int | None,
+) -> list[dict[str, Any]]:
+    """\
+    Merge each shard's results, applying the offset & limit to the whole.
+
+    When ordered, each shard's rows must carry their SHARD_ORDER_KEY.
+    """
+    if order is not None:
+        # each shard's results are already sorted; k-way merge them
+        merged = heapq.merge(
+            *results,
+            # NOTE: postgres sorts NULLs last in ASC, first in DESC
+            key=lambda rec: (rec[SHARD_ORDER_KEY] is None, rec[SHARD_ORDER_KEY]),
+            reverse=order is Order.DESC,
+        )
+    else:
+        merged = itertools.chain.from_iterable(results)
+
+    stop = offset + limit if limit is not None else None
+    recs = list(itertools.islice(merged, offset, stop))
+    if order is not None:
+        for rec in recs:
+            del rec[SHARD_ORDER_KEY]
+    return recs
+
+
+class ShardedConnection:
+    """\
+    Routes queries across several databases by the value of a shard key
+    column (e.g. "account_id"), which all sharded tables share.
+
+    Queries pinning the shard key go to a single shard; others are
+    run on every shard concurrently and their results merged.
+    """
+
+    def __init__(
+        self,
+        dsns: list[str],
+        shard_key: str,
+        shard_function: ShardFunction = hash_shard_function,
+        timeout: float | None = None,
+        statement_timeout: float | None = None,
+    ) -> None:
+        self._connections = [
+            Connection(dsn, timeout=timeout, statement_timeout=statement_timeout)
+            for dsn in dsns
+        ]
+        self._shard_key = shard_key
+        self._shard_function = shard_function
+        self._timeout = timeout
+
+    async def __aenter__(self) -> ShardedConnection:
+        await asyncio.gather(
+            *(connection.__aenter__() for connection in self._connections)
+        )
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await asyncio.gather(
+            *(
+                connection.__aexit__(exc_type, exc_value, traceback)
+                for connection in self._connections
+            )
+        )
+
+    def get_shard(self, shard_key_value: Any) -> Connection:
+        shard = self._shard_function(shard_key_value, len(self._connections))
+        return self._connections[shard]
+
+    def _deadline(
+        self,
+        timeout: float | None | Unset,
+        limiter: str | None,
+    ) -> AsyncContextManager[None]:
+        # NOTE: a query fanned out across shards is still one logical query,
+        # so it takes one limiter slot & one deadline, rather than one per shard
+        if isinstance(timeout, Unset):
+            timeout = self._timeout
+        return deadline(timeout, limiter)
+
+    async def fetch_one(
+        self,
+        query: Query | str,
+        values: dict[str, Any] | None = None,
+        timeout: float | None | Unset = UNSET,
+        limiter: str | None = None,
+    ) -> dict[str, Any] | None:
+        if isinstance(query, Query):
+            shard_key_value = find_shard_key_value(query, self._shard_key)
+            if not isinstance(shard_key_value, Unset):
+                return await self.get_shard(shard_key_value).fetch_one(
+                    query,
+                    values,
+                    timeout=timeout,
+                    limiter=limiter,
+                )
+
+        if isinstance(query, Select):
+            query = copy.copy(query)
+            query._limit = 1
+
+        recs = await self.fetch_all(query, values, timeout=timeout, limiter=limiter)
+        return recs[0] if recs else None
+
+    async def fetch_all(
+        self,
+        query: Query | str,
+        values: dict[str, Any] | None = None,
+        timeout: float | None | Unset = UNSET,
+        limiter: str | None = None,
+    ) -> list[dict[str, Any]]:
+        if isinstance(query, Query):
+            shard_key_value = find_shard_key_value(query, self._shard_key)
+            if not isinstance(shard_key_value, Unset):
+                return await self.get_shard(shard_key_value).fetch_all(
+                    query,
+                    values,
+                    timeout=timeout,
+                    limiter=limiter,
+                )
+
+        if not isinstance(query, Select):
+            results = await self._gather_fetch_all(query, values, timeout, limiter)
+            return list(itertools.chain.from_iterable(results))
+
+        # an aggregate-only select returns one row per shard to be combined
+        if all(isinstance(expression, Aggregate) for expression in query._expressions):
+            aggregates: list[Aggregate] = query._expressions  # type: ignore[assignment]
+            shard_query = copy.copy(query)
+            shard_query._expressions = get_shard_aggregates(aggregates)  # type: ignore
+            results = await self._gather_fetch_all(
+                shard_query,
+                values,
+                timeout,
+                limiter,
+            )
+            return [
+                combine_aggregates(
+                    aggregates,
+                    list(itertools.chain.from_iterable(results)),
+                )
+            ]
+
+        # each shard must return enough rows to satisfy the offset & limit
+        # once merged, so we push the offset into each shard's limit
+        offset = query._offset or 0
+        shard_query = copy.copy(query)
+        shard_query._offset = None
+        if query._limit is not None:
+            shard_query._limit = offset + query._limit
+
+        # the ORDER BY column needn't be selected, so we select it under
+        # a name of our own to merge on, and strip it afterwards
+        order = None
+        if query._order_by is not None:
+            column, order = query._order_by
+            shard_query._expressions = [
+                *query._expressions,
+                ShardOrderKey(column),  # type: ignore[list-item]
+            ]
+
+        results = await self._gather_fetch_all(shard_query, values, timeout, limiter)
+        return merge_shard_results(results, order, offset, query._limit)
+
+    async def execute(
+        self,
+        query: Query | str,
+        values: dict[str, Any] | None = None,
+        timeout: float | None | Unset = UNSET,
+        limiter: str | None = None,
+    ) -> None:
+        if isinstance(query, Query):
+            shard_key_value = find_shard_key_value(query, self._shard_key)
+            if not isinstance(shard_key_value, Unset):
+                await self.get_shard(shard_key_value).execute(
+                    query,
+                    values,
+                    timeout=timeout,
+                    limiter=limiter,
+                )
+                return None
+
+        if isinstance(query, Insert):
+            # split the rows of a multi-row insert across their shards
+            shard_queries: dict[int, Insert] = {}
+            for row in query._rows:
+                shard_key_value = next(
+                    (
+                        value._value
+                        for column, value in row
+                        if column._column_name == self._shard_key
+                    ),
+                    UNSET,
+                )
+                if isinstance(shard_key_value, Unset):
+                    raise ValueError(
+                        f"Inserts into sharded tables must set {self._shard_key}"
+                    )
+                shard = self._shard_function(shard_key_value, len(self._connections))
+                shard_query = shard_queries.setdefault(
+                    shard, insert().into_table(query._into_table)
+                )
+                shard_query._rows.append(row)
+
+            async with self._deadline(timeout, limiter):
+                await asyncio.gather(
+                    *(
+                        self._connections[shard].execute(
+                            shard_query,
+                            values,
+                            timeout=None,
+                        )
+                        for shard, shard_query in shard_queries.items()
+                    )
+                )
+            return None
+
+        # e.g. migrations; run them everywhere
+        async with self._deadline(timeout, limiter):
+            await asyncio.gather(
+                *(
+                    connection.execute(query, values, timeout=None)
+                    for connection in self._connections
+                )
+            )
+        return None
+
+    async def _gather_fetch_all(
+        self,
+        query: Query | str,
+        values: dict[str, Any] | None,
+        timeout: float | None | Unset,
+        limiter: str | None,
+    ) -> list[list[dict[str, Any]]]:
+        async with self._deadline(timeout, limiter):
+            return await asyncio.gather(
+                *(
+                    connection.fetch_all(query, values, timeout=None)
+                    for connection in self._connections
+                )
+            )
@@ -2,7 +2,15 @@ from datetime import datetime
 from typing import Any
 
 from orm._typing import Unset
-from orm.columns import Column, DateTime, Float, Integer, PrimitiveSharedPyTypes, String
+from orm.columns import (
+    Column,
+    DateTime,
+    Float,
+    Integer,
+    PrimitiveSharedPyTypes,
+    SqlLiteral,
+    String,
+)
 from orm.functions import SqlFunction
 from orm.tables import Table
 
@@ -35,6 +43,34 @@ def get_sql_type_from_py_type(py_type: Any) -> str:
         raise NotImplementedError(f"No implementation for this type: {type(py_type)}")
 
 
+def get_catalog_type_from_column(column: Column) -> str:
+    # NOTE: these are the names postgres reports in
+    # information_schema.columns.data_type for our sql types
+    if isinstance(column, Integer):
+        return "integer"
+    elif isinstance(column, String):
+        return "text"
+    elif isinstance(column, DateTime):
+        return "timestamp without time zone"
+    elif isinstance(column, Float):
+        return "double precision"
+    else:
+        raise NotImplementedError(f"No implementation for this type: {type(column)}")
+
+
+def get_sql_default_from_column(column: Column) -> str | None:
+    if isinstance(column._default, Unset):
+        return None
+    elif isinstance(column._default, SqlFunction):
+        return column._default.convert_to_sql()
+    elif isinstance(column._default, PrimitiveSharedPyTypes | None):
+        return SqlLiteral(column._default).convert_to_sql()
+    else:
+        raise NotImplementedError(
+            f"No implementation for this type: {type(column._default)}"
+        )
+
+
 def generate_up_migration_code(table: Table) -> str:
     """\
     A function to generate the up migration code for a table.
@@ -47,29 +83,22 @@ def generate_up_migration_code(table: Table) -> str:
     );
 
     CREATE TABLE payments (
-        payment_id SERIAL PRIMARY KEY,
+        payment_id SERIAL NOT NULL,
         account_id INTEGER NOT NULL,
         amount FLOAT NOT NULL,
         created_at TIMESTAMP NOT NULL DEFAULT NOW(),
         updated_at TIMESTAMP NULL DEFAULT NULL,
-    );
+        PRIMARY KEY (payment_id, created_at),
+    ) PARTITION BY RANGE (created_at);
     """
+    partition_by = table.__partition_by__
+
     query = f"CREATE TABLE {table.__tablename__} (\n"
     for column in table.__columns__:
         nullable = "NULL" if column._nullable else "NOT NULL"
         primary_key = "PRIMARY KEY" if column._primary_key else ""
-        if isinstance(column._default, Unset):
-            default = ""
-        else:
-            if isinstance(column._default, SqlFunction):
-                default = column._default.convert_to_sql()
-            elif isinstance(column._default, PrimitiveSharedPyTypes | None):
-                default = get_sql_type_from_py_type(column._default)
-            else:
-                raise NotImplementedError(
-                    f"No implementation for this type: {type(column._default)}"
-                )
-
+        default = get_sql_default_from_column(column)
+        if default is not None:
             default = f"DEFAULT {default}"
 
         column_type = get_sql_type_from_column(column)
@@ -77,13 +106,81 @@ def generate_up_migration_code(table: Table) -> str:
             column_type = "SERIAL"
 
         query += f"    {column._column_name} {column_type} {nullable}"
-        if primary_key:
+        if primary_key and partition_by is None:
             query += f" {primary_key}"
         if default:
             query += f" {default}"
         query += ",\n"
 
+    if partition_by is not None and table.__primary_key__ is not None:
+        # NOTE: unique constraints on a partitioned table must
+        # include the partition key, so we use a composite key
+        key_columns = [table.__primary_key__]
+        if partition_by._column._column_name != table.__primary_key__:
+            key_columns.append(partition_by._column._column_name)
+        query += f"    PRIMARY KEY ({', '.join(key_columns)}),\n"
+
     query = query[:-2]  # no trailing comma
 
-    query += "\n);"
+    query += "\n)"
+    if partition_by is not None:
+        query += f" PARTITION BY RANGE ({partition_by._column._column_name})"
+    query += ";"
     return query
+
+
+def get_cache_channel(table: Table) -> str:
+    return f"orm_cache_{table.__tablename__}"
+
+
+def generate_cache_trigger_code(table: Table) -> list[str]:
+    """\
+    A function to generate the code to install triggers which notify
+    table caches of changes to a cached table's rows.
+
+    The payloads are small json objects, e.g. {"op": "UPDATE", "key": 1}
+    (plus "old_key" for updates); caches re-read rows by primary key.
+    """
+    assert table.__primary_key__ is not None, f"{table.__tablename__} has no key"
+
+    table_name = table.__tablename__
+    primary_key = table.__primary_key__
+    channel = get_cache_channel(table)
+    function_name = f"{table_name}_notify_cache"
+
+    return [
+        f"""\
+CREATE OR REPLACE FUNCTION {function_name}() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        PERFORM pg_notify('{channel}', json_build_object('op', TG_OP)::text);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify(
+            '{channel}',
+            json_build_object('op', TG_OP, 'key', OLD.{primary_key})::text
+        );
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM pg_notify(
+            '{channel}',
+            json_build_object(
+                'op', TG_OP,
+                'key', NEW.{primary_key},
+                'old_key', OLD.{primary_key}
+            )::text
+        );
+    ELSE
+        PERFORM pg_notify(
+            '{channel}',
+            json_build_object('op', TG_OP, 'key', NEW.{primary_key})::text
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql""",
+        f"CREATE OR REPLACE TRIGGER {function_name} "
+        f"AFTER INSERT OR UPDATE OR DELETE ON {table_name} "
+        f"FOR EACH ROW EXECUTE FUNCTION {function_name}()",
+        f"CREATE OR REPLACE TRIGGER {function_name}_truncate "
+        f"AFTER TRUNCATE ON {table_name} "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION {function_name}()",
+    ]
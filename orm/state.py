@@ -3,6 +3,8 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from orm.limiters import ConcurrencyLimiter
     from orm.tables import Table
 
 TABLE_INSTANCES: dict[str, Table] = {}
+LIMITERS: dict[str, ConcurrencyLimiter] = {}
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-from typing import Any, TypeVar
+from typing import TYPE_CHECKING, Any, TypeVar
 
 from orm import state
 from orm.columns import Column
 
+if TYPE_CHECKING:
+    from orm.partitions import RangePartition
+
 
 # TODO: can we automate columns getting table & column names using this?
 # currently it causes quite a lot of duplication
@@ -23,6 +26,8 @@ class TableMeta(type):
                 if v._primary_key:
                     classdict["__primary_key__"] = v._column_name
         classdict["__columns__"] = tuple(columns)
+        classdict.setdefault("__partition_by__", None)
+        classdict.setdefault("__cached__", False)
         return super().__new__(cls, name, bases, classdict)
 
 
@@ -30,11 +35,21 @@ class Table(metaclass=TableMeta):
     __tablename__: str
     __primary_key__: str | None
     __columns__: tuple[Column, ...]
+    __partition_by__: RangePartition | None
+    __cached__: bool
 
 
 T = TypeVar("T", bound="Table")
 
 
+def get_primary_key_column(table: Table) -> Column:
+    assert table.__primary_key__ is not None, f"{table.__tablename__} has no key"
+    for column in table.__columns__:
+        if column._column_name == table.__primary_key__:
+            return column
+    raise ValueError(f"{table.__tablename__} has no column {table.__primary_key__}")
+
+
 def table_instance(cls: type[T]) -> T:
     # XXX:HACK super based way to make them all instances
     # basically we get `Table` instead of `type[Table]`
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+from types import TracebackType
+from typing import TYPE_CHECKING, Any
+
+from orm import state
+from orm._typing import UNSET, Unset
+from orm.queries import Query
+from orm.queries.delete import delete
+from orm.queries.insert import insert
+from orm.queries.update import bulk_update, update
+from orm.tables import get_primary_key_column
+
+if TYPE_CHECKING:
+    from orm.columns import Column
+    from orm.connections import Connection
+    from orm.tables import Table
+
+
+def get_inserted_key(table: Table, values: list[tuple[Column, Any]]) -> Any:
+    for column, value in values:
+        if column._column_name == table.__primary_key__:
+            return value
+    return UNSET
+
+
+def get_table_order(table: Table) -> int:
+    # NOTE: we have no foreign key metadata, so we rely on tables
+    # being declared after the tables they reference (as in main.py)
+    table_names = list(state.TABLE_INSTANCES)
+    if table.__tablename__ in table_names:
+        return table_names.index(table.__tablename__)
+    return len(table_names)
+
+
+class UnitOfWork:
+    """\
+    Queues inserts, updates & deletes, and flushes them in a single
+    transaction as the fewest statements possible.
+
+    async with UnitOfWork(connection) as uow:
+        uow.insert(Payments, [(Payments.account_id, 1), (Payments.amount, 5.0)])
+        uow.update(Accounts, 1, [(Accounts.account_type, "premium")])
+        uow.delete(Payments, 3)
+
+    On flush, statements are ordered for dependency safety: inserts, then
+    updates (parent tables first), then deletes (child tables first).
+    A row that's deleted & then inserted again is deleted before the inserts.
+    """
+
+    def __init__(self, connection: Connection) -> None:
+        self._connection = connection
+        self._tables: dict[str, Table] = {}
+        self._inserts: dict[str, list[list[tuple[Column, Any]]]] = {}
+        self._updates: dict[str, dict[Any, dict[str, tuple[Column, Any]]]] = {}
+        self._deletes: dict[str, list[Any]] = {}
+        # deletes that must run before the inserts, as the key is reused
+        self._early_deletes: dict[str, list[Any]] = {}
+
+    async def __aenter__(self) -> UnitOfWork:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            await self.flush()
+        else:
+            self.clear()
+
+    def insert(self, table: Table, values: list[tuple[Column, Any]]) -> None:
+        self._tables[table.__tablename__] = table
+        primary_key = get_inserted_key(table, values)
+        deletes = self._deletes.get(table.__tablename__, [])
+        if not isinstance(primary_key, Unset) and primary_key in deletes:
+            deletes.remove(primary_key)
+            self._early_deletes.setdefault(table.__tablename__, []).append(
+                primary_key
+            )
+        self._inserts.setdefault(table.__tablename__, []).append(values)
+
+    def update(
+        self,
+        table: Table,
+        primary_key: Any,
+        values: list[tuple[Column, Any]],
+    ) -> None:
+        if primary_key in self._deletes.get(table.__tablename__, []):
+            raise ValueError(
+                f"Can't update {table.__tablename__} {primary_key!r}, "
+                "it's already queued for deletion"
+            )
+
+        self._tables[table.__tablename__] = table
+        # coalesce updates to the same row; later values win
+        row = self._updates.setdefault(table.__tablename__, {}).setdefault(
+            primary_key, {}
+        )
+        for column, value in values:
+            row[column._column_name] = (column, value)
+
+    def delete(self, table: Table, primary_key: Any) -> None:
+        self._tables[table.__tablename__] = table
+        # no point updating a row we're about to delete
+        self._updates.get(table.__tablename__, {}).pop(primary_key, None)
+
+        # a row inserted in this unit of work was never written,
+        # so rather than deleting it, we just don't insert it
+        inserts = self._inserts.get(table.__tablename__, [])
+        remaining_inserts = [
+            values
+            for values in inserts
+            if get_inserted_key(table, values) != primary_key
+        ]
+        if len(remaining_inserts) != len(inserts):
+            self._inserts[table.__tablename__] = remaining_inserts
+            return
+
+        deletes = self._deletes.setdefault(table.__tablename__, [])
+        if primary_key not in deletes:
+            deletes.append(primary_key)
+
+    def clear(self) -> None:
+        self._tables.clear()
+        self._inserts.clear()
+        self._updates.clear()
+        self._deletes.clear()
+        self._early_deletes.clear()
+
+    def build_queries(self) -> list[Query]:
+        tables = sorted(self._tables.values(), key=get_table_order)
+        queries: list[Query] = []
+
+        for table in reversed(tables):
+            primary_keys = self._early_deletes.get(table.__tablename__)
+            if primary_keys:
+                queries.append(
+                    delete()
+                    .from_table(table)
+                    .where([get_primary_key_column(table).in_(primary_keys)])
+                )
+
+        for table in tables:
+            # one multi-row insert per set of columns
+            insert_groups: dict[tuple[str, ...], list[list[tuple[Column, Any]]]] = {}
+            for values in self._inserts.get(table.__tablename__, []):
+                group = tuple(column._column_name for column, _ in values)
+                insert_groups.setdefault(group, []).append(values)
+
+            for rows in insert_groups.values():
+                query = insert().into_table(table)
+                for values in rows:
+                    query.values(values)
+                queries.append(query)
+
+        for table in tables:
+            updates = self._updates.get(table.__tablename__)
+            if not updates:
+                continue
+
+            # one bulk update per set of columns
+            update_groups: dict[tuple[str, ...], dict[Any, Any]] = {}
+            for primary_key, row in updates.items():
+                group = tuple(sorted(row))
+                update_groups.setdefault(group, {})[primary_key] = [
+                    row[column_name] for column_name in group
+                ]
+
+            primary_key_column = get_primary_key_column(table)
+            for rows in update_groups.values():
+                if len(rows) == 1:
+                    [(primary_key, values)] = rows.items()
+                    queries.append(
+                        update()
+                        .table(table)
+                        .set(values)
+                        .where([primary_key_column == primary_key])
+                    )
+                    continue
+
+                query = bulk_update().table(table).key(primary_key_column)
+                for primary_key, values in rows.items():
+                    query.values(primary_key, values)
+                queries.append(query)
+
+        for table in reversed(tables):
+            primary_keys = self._deletes.get(table.__tablename__)
+            if primary_keys:
+                queries.append(
+                    delete()
+                    .from_table(table)
+                    .where([get_primary_key_column(table).in_(primary_keys)])
+                )
+
+        return queries
+
+    async def flush(self) -> None:
+        queries = self.build_queries()
+        if queries:
+            async with self._connection.transaction():
+                for query in queries:
+                    await self._connection.execute(query)
+
+        self.clear()
+        return None
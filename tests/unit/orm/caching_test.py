@@ -0,0 +1,204 @@
+import asyncio
+import json
+import re
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable
+
+import pytest
+
+from orm import state
+from orm.caching import TableCache
+from orm.columns import Integer, String
+from orm.queries.select import Select
+from orm.sql_generation import generate_cache_trigger_code, get_cache_channel
+from orm.tables import Table
+
+
+class AccountTypesTable(Table):
+    __tablename__ = "account_types"
+    __cached__ = True
+
+    account_type_id = Integer("account_types", "account_type_id", primary_key=True)
+    name = String("account_types", "name")
+
+
+AccountTypes = AccountTypesTable()
+
+
+class FakeRawConnection:
+    """Serves rows from memory, reading a snapshot before yielding."""
+
+    def __init__(self, rows: dict[int, dict[str, Any]]) -> None:
+        self.rows = rows
+        self.listeners: dict[str, Callable[..., None]] = {}
+        self.fetch_started = asyncio.Event()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def add_termination_listener(self, callback: Callable[..., None]) -> None:
+        pass
+
+    async def add_listener(self, channel: str, callback: Callable[..., None]) -> None:
+        self.listeners[channel] = callback
+
+    def is_closed(self) -> bool:
+        return False
+
+    async def execute(self, query: str, timeout: float | None = None) -> None:
+        pass
+
+    async def fetch(self, query: str) -> list[dict[str, Any]]:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            match = re.search(r"= (\d+)$", query)
+            if match is None:
+                recs = [dict(row) for row in self.rows.values()]
+            else:
+                row = self.rows.get(int(match.group(1)))
+                recs = [dict(row)] if row is not None else []
+            self.fetch_started.set()
+            for _ in range(5):
+                await asyncio.sleep(0)
+            return recs
+        finally:
+            self.in_flight -= 1
+
+    def notify(self, op: str, key: int) -> None:
+        channel = get_cache_channel(AccountTypes)
+        payload = json.dumps({"op": op, "key": key, "old_key": key})
+        self.listeners[channel](self, 1, channel, payload)
+
+
+class FakeConnection:
+    """The pool; the first `failures` attempts to listen fail."""
+
+    def __init__(self, raw_connection: FakeRawConnection, failures: int = 0) -> None:
+        self._raw_connection = raw_connection
+        self.failures = failures
+        self.listen_attempts = 0
+        self.fetches = 0
+
+    async def fetch_all(self, query: Select) -> list[dict[str, Any]]:
+        self.fetches += 1
+        return await self._raw_connection.fetch(query.convert_to_sql())
+
+    async def fetch_one(self, query: Select) -> dict[str, Any] | None:
+        recs = await self.fetch_all(query)
+        return recs[0] if recs else None
+
+    @asynccontextmanager
+    async def raw_connection(self) -> AsyncIterator[FakeRawConnection]:
+        self.listen_attempts += 1
+        if self.listen_attempts <= self.failures:
+            raise ConnectionRefusedError("database is restarting")
+        yield self._raw_connection
+
+
+async def wait_for_listener(cache: TableCache, raw: FakeRawConnection) -> None:
+    while not raw.listeners:
+        await asyncio.sleep(0)
+    # reloads are queued behind the listener's own initial reload
+    await cache.reload()
+
+
+@pytest.fixture(autouse=True)
+def cached_tables(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(state, "TABLE_INSTANCES", {"account_types": AccountTypes})
+
+
+def test_notifications_are_applied_in_order() -> None:
+    raw_connection = FakeRawConnection({1: {"account_type_id": 1, "name": "basic"}})
+
+    async def run() -> None:
+        connection: Any = FakeConnection(raw_connection)
+        async with asyncio.timeout(5), TableCache(connection) as cache:
+            await wait_for_listener(cache, raw_connection)
+
+            # the row is deleted while the update's re-read is in flight
+            raw_connection.rows[1]["name"] = "premium"
+            raw_connection.fetch_started.clear()
+            raw_connection.notify("UPDATE", 1)
+            await raw_connection.fetch_started.wait()
+            del raw_connection.rows[1]
+            raw_connection.notify("DELETE", 1)
+            for key in range(2, 12):
+                raw_connection.rows[key] = {"account_type_id": key, "name": "new"}
+                raw_connection.notify("INSERT", key)
+
+            await cache.wait_for_pending()
+            assert cache.get(AccountTypes, 1) is None
+            assert len(cache.all(AccountTypes)) == 10
+
+            # a reload is queued behind notifications, like any other work
+            raw_connection.rows[2]["name"] = "renamed"
+            await cache.reload()
+            assert cache.get(AccountTypes, 2) == {
+                "account_type_id": 2,
+                "name": "renamed",
+            }
+
+    asyncio.run(run())
+
+    assert raw_connection.max_in_flight == 1
+
+
+def test_falls_back_to_reloads_until_it_can_listen() -> None:
+    raw_connection = FakeRawConnection({1: {"account_type_id": 1, "name": "basic"}})
+    connection: Any = FakeConnection(raw_connection, failures=2)
+
+    async def run() -> None:
+        async with (
+            asyncio.timeout(5),
+            TableCache(connection, reload_interval=0.01) as cache,
+        ):
+            assert connection.fetches == 1
+            raw_connection.rows[1]["name"] = "premium"
+
+            await wait_for_listener(cache, raw_connection)
+
+            # a full reload from the pool after each failed attempt to listen
+            assert connection.listen_attempts == 3
+            assert connection.fetches == 3
+            assert cache.get(AccountTypes, 1) == {
+                "account_type_id": 1,
+                "name": "premium",
+            }
+
+            # & once resubscribed, notifications are applied again
+            raw_connection.rows[2] = {"account_type_id": 2, "name": "new"}
+            raw_connection.notify("INSERT", 2)
+            await cache.wait_for_pending()
+            assert cache.get(AccountTypes, 2) == {"account_type_id": 2, "name": "new"}
+
+    asyncio.run(run())
+
+
+def test_cache_trigger_code() -> None:
+    function, row_trigger, truncate_trigger = generate_cache_trigger_code(
+        AccountTypes
+    )
+
+    assert function.startswith(
+        "CREATE OR REPLACE FUNCTION account_types_notify_cache() RETURNS trigger"
+    )
+    assert (
+        "json_build_object('op', TG_OP, 'key', OLD.account_type_id)::text" in function
+    )
+    assert "'old_key', OLD.account_type_id" in function
+    assert (
+        "pg_notify('orm_cache_account_types', json_build_object('op', TG_OP)::text)"
+        in function
+    )
+    # one notification per operation: TRUNCATE, DELETE, UPDATE & INSERT
+    assert function.count("'orm_cache_account_types'") == 4
+    assert row_trigger == (
+        "CREATE OR REPLACE TRIGGER account_types_notify_cache "
+        "AFTER INSERT OR UPDATE OR DELETE ON account_types "
+        "FOR EACH ROW EXECUTE FUNCTION account_types_notify_cache()"
+    )
+    assert truncate_trigger == (
+        "CREATE OR REPLACE TRIGGER account_types_notify_cache_truncate "
+        "AFTER TRUNCATE ON account_types "
+        "FOR EACH STATEMENT EXECUTE FUNCTION account_types_notify_cache()"
+    )
@@ -0,0 +1,17 @@
+import pytest
+
+from orm.columns import Integer
+
+account_id = Integer("payments", "account_id")
+
+
+def test_in() -> None:
+    assert account_id.in_([1, 2]).convert_to_sql() == "payments.account_id IN (1, 2)"
+    assert account_id.not_in([1]).convert_to_sql() == "payments.account_id NOT IN (1)"
+
+
+def test_in_needs_values() -> None:
+    with pytest.raises(AssertionError):
+        account_id.in_([])
+    with pytest.raises(AssertionError):
+        account_id.not_in([])
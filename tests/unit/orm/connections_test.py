@@ -0,0 +1,295 @@
+import asyncio
+import gzip
+import io
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+import pytest
+
+from orm import state
+from orm.connections import Connection, open_export_sink
+from orm.limiters import ConcurrencyLimiter
+
+
+class AsyncWriter:
+    """Stands in for e.g. an aiofiles file."""
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+
+    async def write(self, chunk: bytes) -> None:
+        self.chunks.append(chunk)
+
+
+class SlowDatabase:
+    """Stands in for databases.Database, taking `delay` seconds per query."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+
+    async def fetch_all(self, query: str, values: Any) -> list[Any]:
+        await asyncio.sleep(self.delay)
+        return []
+
+
+class Record:
+    def __init__(self, mapping: dict[str, Any]) -> None:
+        self._mapping = mapping
+
+
+class EchoDatabase:
+    """Stands in for databases.Database, echoing back each query."""
+
+    def __init__(self) -> None:
+        self.queries: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _run(self, query: str) -> Record:
+        self.queries.append(query)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            for _ in range(5):
+                await asyncio.sleep(0)
+            return Record({"query": query})
+        finally:
+            self.in_flight -= 1
+
+    async def fetch_one(self, query: str, values: Any) -> Record:
+        return await self._run(query)
+
+    async def fetch_all(self, query: str, values: Any) -> list[Record]:
+        return [await self._run(query)]
+
+
+def echo_connection() -> tuple[Connection, EchoDatabase]:
+    connection = Connection("postgresql://localhost/test")
+    database = EchoDatabase()
+    connection._connection = database  # type: ignore[assignment]
+    return connection, database
+
+
+class FakeRawConnection:
+    """Streams `chunks` to the COPY output, optionally failing afterwards."""
+
+    def __init__(self, chunks: list[bytes], error: Exception | None = None) -> None:
+        self.chunks = chunks
+        self.error = error
+        self.copy_options: dict[str, Any] = {}
+        self.max_buffered = 0
+
+    async def copy_from_query(self, query: str, output: Any, **kwargs: Any) -> None:
+        self.copy_options = kwargs
+        for chunk in self.chunks:
+            await output(chunk)
+            # output is the bound put() of the export's queue
+            self.max_buffered = max(self.max_buffered, output.__self__.qsize())
+        if self.error is not None:
+            raise self.error
+
+
+def fake_connection(raw_connection: FakeRawConnection) -> Connection:
+    connection = Connection("postgresql://localhost/test")
+
+    @asynccontextmanager
+    async def fake_raw_connection() -> AsyncIterator[Any]:
+        yield raw_connection
+
+    connection.raw_connection = fake_raw_connection  # type: ignore[method-assign]
+    return connection
+
+
+async def write_to_sink(sink: Any, chunks: list[bytes]) -> None:
+    async with open_export_sink(sink) as write:
+        for chunk in chunks:
+            await write(chunk)
+
+
+def test_export_sink_path(tmp_path: Path) -> None:
+    path = tmp_path / "export.csv"
+
+    asyncio.run(write_to_sink(path, [b"a,b\n", b"1,2\n"]))
+
+    assert path.read_bytes() == b"a,b\n1,2\n"
+
+
+def test_export_sink_binary_file() -> None:
+    file = io.BytesIO()
+
+    asyncio.run(write_to_sink(file, [b"a,b\n", b"1,2\n"]))
+
+    assert file.getvalue() == b"a,b\n1,2\n"
+
+
+def test_export_sink_async_writer() -> None:
+    writer = AsyncWriter()
+
+    asyncio.run(write_to_sink(writer, [b"a,b\n", b"1,2\n"]))
+
+    assert writer.chunks == [b"a,b\n", b"1,2\n"]
+
+
+def test_export_sink_async_callable() -> None:
+    writer = AsyncWriter()
+
+    asyncio.run(write_to_sink(writer.write, [b"a,b\n"]))
+
+    assert writer.chunks == [b"a,b\n"]
+
+
+def test_export_sink_rejects_sync_writer() -> None:
+    class SyncWriter:
+        def write(self, chunk: bytes) -> None:
+            pass
+
+    with pytest.raises(TypeError):
+        asyncio.run(write_to_sink(SyncWriter(), [b"a,b\n"]))
+
+
+def test_failed_export_removes_partial_file(tmp_path: Path) -> None:
+    path = tmp_path / "export.csv"
+    raw_connection = FakeRawConnection(
+        [b"payment_id\n", b"1\n"],
+        error=ConnectionResetError("connection lost mid-copy"),
+    )
+
+    with pytest.raises(ConnectionResetError):
+        asyncio.run(fake_connection(raw_connection).export("SELECT 1", path))
+
+    assert not path.exists()
+
+
+@pytest.mark.parametrize(
+    ("format", "header", "expected"),
+    [
+        ("csv", True, {"format": "csv", "header": True}),
+        ("csv", False, {"format": "csv", "header": False}),
+        ("binary", True, {"format": "binary"}),
+    ],
+)
+def test_export_copy_options(
+    format: Any,
+    header: bool,
+    expected: dict[str, Any],
+) -> None:
+    raw_connection = FakeRawConnection([b"1\n"])
+    connection = fake_connection(raw_connection)
+
+    asyncio.run(
+        connection.export("SELECT 1", io.BytesIO(), format=format, header=header)
+    )
+
+    assert raw_connection.copy_options == expected
+
+
+def test_export_gzip() -> None:
+    chunks = [f"{i},{i * 2.5}\n".encode() for i in range(100)]
+    file = io.BytesIO()
+
+    asyncio.run(
+        fake_connection(FakeRawConnection(chunks)).export(
+            "SELECT 1",
+            file,
+            compression="gzip",
+        )
+    )
+
+    assert gzip.decompress(file.getvalue()) == b"".join(chunks)
+
+
+def test_export_buffers_at_most_max_buffered_chunks() -> None:
+    chunks = [f"{i}\n".encode() for i in range(20)]
+    raw_connection = FakeRawConnection(chunks)
+    writer = AsyncWriter()
+
+    async def slow_write(chunk: bytes) -> None:
+        await asyncio.sleep(0.001)
+        await writer.write(chunk)
+
+    asyncio.run(
+        fake_connection(raw_connection).export(
+            "SELECT 1",
+            slow_write,
+            max_buffered_chunks=2,
+        )
+    )
+
+    # the reader got ahead of the slow sink, but only as far as the bound
+    assert raw_connection.max_buffered == 2
+    assert writer.chunks == chunks
+
+
+def test_statement_timeout_is_sent_in_milliseconds() -> None:
+    connection = Connection("postgresql://localhost/test", statement_timeout=1.5)
+
+    assert connection._connection.options == {
+        "server_settings": {"statement_timeout": "1500"},
+    }
+
+
+def test_timeout_frees_the_limiter(monkeypatch: pytest.MonkeyPatch) -> None:
+    limiter = ConcurrencyLimiter("analytics", max_concurrency=1, max_queued=0)
+    monkeypatch.setitem(state.LIMITERS, "analytics", limiter)
+    connection = Connection("postgresql://localhost/test", timeout=0.01)
+    connection._connection = SlowDatabase(delay=10.0)  # type: ignore[assignment]
+
+    async def run() -> None:
+        with pytest.raises(TimeoutError):
+            await connection.fetch_all("SELECT 1", limiter="analytics")
+        assert not limiter._semaphore.locked()
+
+        # the slot is free, so the next query isn't shed
+        connection._connection.delay = 0.0  # type: ignore[attr-defined]
+        assert await connection.fetch_all("SELECT 1", limiter="analytics") == []
+
+    asyncio.run(run())
+
+
+def test_batch_results_are_in_order() -> None:
+    connection, database = echo_connection()
+
+    async def run() -> list[Any]:
+        async with connection.batch() as batch:
+            batch.fetch_all("SELECT 1")
+            batch.fetch_one("SELECT 2")
+            batch.fetch_all("SELECT 3")
+        return batch.results
+
+    assert asyncio.run(run()) == [
+        [{"query": "SELECT 1"}],
+        {"query": "SELECT 2"},
+        [{"query": "SELECT 3"}],
+    ]
+    # the queries all ran at the same time
+    assert database.max_in_flight == 3
+
+
+def test_batch_is_cleared_on_error() -> None:
+    connection, database = echo_connection()
+
+    async def run() -> None:
+        async with connection.batch() as batch:
+            batch.fetch_all("SELECT 1")
+            raise RuntimeError("oops")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+
+    assert database.queries == []
+
+
+def test_batch_takes_one_limiter_slot(monkeypatch: pytest.MonkeyPatch) -> None:
+    limiter = ConcurrencyLimiter("analytics", max_concurrency=4, max_queued=2)
+    monkeypatch.setitem(state.LIMITERS, "analytics", limiter)
+    connection, database = echo_connection()
+
+    async def run() -> list[Any]:
+        async with connection.batch(limiter="analytics") as batch:
+            for i in range(8):
+                batch.fetch_one(f"SELECT {i}")
+        return batch.results
+
+    assert asyncio.run(run()) == [{"query": f"SELECT {i}"} for i in range(8)]
+    assert database.max_in_flight == 8
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from orm import state
+from orm.limiters import (
+    ConcurrencyLimiter,
+    ConcurrencyLimitExceeded,
+    get_limiter,
+    register_limiter,
+)
+
+
+async def run_callers(limiter: ConcurrencyLimiter, count: int) -> list[int | str]:
+    async def call(index: int) -> int | str:
+        try:
+            async with limiter:
+                await asyncio.sleep(0.01)
+                return index
+        except ConcurrencyLimitExceeded:
+            return "shed"
+
+    return await asyncio.gather(*(call(index) for index in range(count)))
+
+
+def test_limiter_queues_then_sheds() -> None:
+    limiter = ConcurrencyLimiter("analytics", max_concurrency=1, max_queued=1)
+
+    assert asyncio.run(run_callers(limiter, 4)) == [0, 1, "shed", "shed"]
+
+
+def test_limiter_without_max_queued_never_sheds() -> None:
+    limiter = ConcurrencyLimiter("analytics", max_concurrency=1)
+
+    assert asyncio.run(run_callers(limiter, 4)) == [0, 1, 2, 3]
+
+
+def test_limiter_caps_concurrency() -> None:
+    limiter = ConcurrencyLimiter("analytics", max_concurrency=2)
+    running = 0
+    max_running = 0
+
+    async def call() -> None:
+        nonlocal running, max_running
+        async with limiter:
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    async def run() -> None:
+        await asyncio.gather(*(call() for _ in range(6)))
+
+    asyncio.run(run())
+    assert max_running == 2
+
+
+def test_get_limiter() -> None:
+    limiter = register_limiter("reports", max_concurrency=4)
+    try:
+        assert get_limiter("reports") is limiter
+    finally:
+        del state.LIMITERS["reports"]
+
+
+def test_get_unregistered_limiter() -> None:
+    with pytest.raises(ValueError, match="No concurrency limiter registered"):
+        get_limiter("nonexistent")
@@ -0,0 +1,214 @@
+from typing import Any
+
+import pytest
+
+from orm.columns import DateTime, Float, Integer, String
+from orm.functions import SqlFunction
+from orm.migrations import (
+    generate_add_column_step,
+    generate_alter_migration_steps,
+    generate_set_not_null_steps,
+    normalize_sql_default,
+)
+from orm.tables import Table
+
+
+class PaymentsTable(Table):
+    __tablename__ = "payments"
+
+    payment_id = Integer("payments", "payment_id", primary_key=True)
+    amount = Float("payments", "amount")
+    priority = Integer("payments", "priority", default=-1)
+    created_at = DateTime("payments", "created_at", default=SqlFunction.NOW)
+    updated_at = DateTime("payments", "updated_at", nullable=True, default=None)
+
+
+Payments = PaymentsTable()
+
+
+def live_column(
+    data_type: str,
+    nullable: bool,
+    default: str | None = None,
+) -> dict[str, Any]:
+    return {
+        "data_type": data_type,
+        "is_nullable": "YES" if nullable else "NO",
+        "column_default": default,
+    }
+
+
+def live_payments_columns() -> dict[str, dict[str, Any]]:
+    # as reported by information_schema.columns for the declared table
+    return {
+        "payment_id": live_column(
+            "integer",
+            nullable=False,
+            default="nextval('payments_payment_id_seq'::regclass)",
+        ),
+        "amount": live_column("double precision", nullable=False),
+        "priority": live_column("integer", nullable=False, default="'-1'::integer"),
+        "created_at": live_column(
+            "timestamp without time zone",
+            nullable=False,
+            default="now()",
+        ),
+        "updated_at": live_column(
+            "timestamp without time zone",
+            nullable=True,
+            default="NULL::timestamp without time zone",
+        ),
+    }
+
+
+@pytest.mark.parametrize(
+    ("default", "expected"),
+    [
+        (None, None),
+        ("NULL::timestamp without time zone", None),
+        ("now()", "now()"),
+        ("NOW()", "now()"),
+        ("'foo'::text", "'foo'"),
+        ("'Foo'::text", "'Foo'"),
+        ("'-1'::integer", "-1"),
+        ("'-1.5'::double precision", "-1.5"),
+        ("-1", "-1"),
+        ("5", "5"),
+    ],
+)
+def test_normalize_sql_default(default: str | None, expected: str | None) -> None:
+    assert normalize_sql_default(default) == expected
+
+
+def test_matching_columns_produce_no_steps() -> None:
+    assert generate_alter_migration_steps(Payments, live_payments_columns()) == []
+
+
+def test_add_column() -> None:
+    live_columns = live_payments_columns()
+    del live_columns["updated_at"]
+
+    [step] = generate_alter_migration_steps(Payments, live_columns)
+
+    assert step.sql == (
+        "ALTER TABLE payments ADD COLUMN updated_at TIMESTAMP NULL DEFAULT NULL"
+    )
+    assert not step.is_blocking
+
+
+def test_drop_column() -> None:
+    live_columns = live_payments_columns()
+    live_columns["legacy"] = live_column("text", nullable=True)
+
+    [step] = generate_alter_migration_steps(Payments, live_columns)
+
+    assert step.sql == "ALTER TABLE payments DROP COLUMN legacy"
+    # dropping data is never run automatically
+    assert step.is_blocking
+
+
+def test_set_default() -> None:
+    live_columns = live_payments_columns()
+    live_columns["created_at"]["column_default"] = None
+
+    [step] = generate_alter_migration_steps(Payments, live_columns)
+
+    assert step.sql == "ALTER TABLE payments ALTER COLUMN created_at SET DEFAULT NOW()"
+    assert not step.is_blocking
+
+
+def test_drop_default() -> None:
+    live_columns = live_payments_columns()
+    live_columns["amount"]["column_default"] = "0"
+
+    [step] = generate_alter_migration_steps(Payments, live_columns)
+
+    assert step.sql == "ALTER TABLE payments ALTER COLUMN amount DROP DEFAULT"
+    assert not step.is_blocking
+
+
+def test_drop_not_null() -> None:
+    live_columns = live_payments_columns()
+    live_columns["updated_at"]["is_nullable"] = "NO"
+
+    [step] = generate_alter_migration_steps(Payments, live_columns)
+
+    assert step.sql == "ALTER TABLE payments ALTER COLUMN updated_at DROP NOT NULL"
+    assert not step.is_blocking
+
+
+def test_set_not_null() -> None:
+    live_columns = live_payments_columns()
+    live_columns["amount"]["is_nullable"] = "YES"
+
+    steps = generate_alter_migration_steps(Payments, live_columns)
+
+    assert [step.sql for step in steps] == [
+        "ALTER TABLE payments DROP CONSTRAINT IF EXISTS payments_amount_not_null",
+        "ALTER TABLE payments ADD CONSTRAINT payments_amount_not_null "
+        "CHECK (amount IS NOT NULL) NOT VALID",
+        "ALTER TABLE payments VALIDATE CONSTRAINT payments_amount_not_null",
+        "ALTER TABLE payments ALTER COLUMN amount SET NOT NULL",
+        "ALTER TABLE payments DROP CONSTRAINT payments_amount_not_null",
+    ]
+    assert not any(step.is_blocking for step in steps)
+
+
+def test_set_not_null_steps_match_the_diff() -> None:
+    live_columns = live_payments_columns()
+    live_columns["amount"]["is_nullable"] = "YES"
+
+    diff_steps = generate_alter_migration_steps(Payments, live_columns)
+    steps = generate_set_not_null_steps(Payments, Payments.amount)
+
+    assert [step.sql for step in steps] == [step.sql for step in diff_steps]
+
+
+def test_type_change_is_blocking() -> None:
+    live_columns = live_payments_columns()
+    live_columns["amount"]["data_type"] = "integer"
+
+    [step] = generate_alter_migration_steps(Payments, live_columns)
+
+    assert step.sql == (
+        "ALTER TABLE payments ALTER COLUMN amount TYPE FLOAT USING amount::FLOAT"
+    )
+    assert step.is_blocking
+
+
+def test_add_nullable_column_is_not_blocking() -> None:
+    column = String("payments", "currency", nullable=True)
+
+    step = generate_add_column_step(Payments, column)
+
+    assert step.sql == "ALTER TABLE payments ADD COLUMN currency TEXT NULL"
+    assert not step.is_blocking
+
+
+def test_add_not_null_column_with_default_is_not_blocking() -> None:
+    column = String("payments", "currency", default="EUR")
+
+    step = generate_add_column_step(Payments, column)
+
+    assert step.sql == (
+        "ALTER TABLE payments ADD COLUMN currency TEXT NOT NULL DEFAULT 'EUR'"
+    )
+    assert not step.is_blocking
+
+
+def test_add_not_null_column_without_default_is_blocking() -> None:
+    column = String("payments", "currency")
+
+    step = generate_add_column_step(Payments, column)
+
+    assert step.sql == "ALTER TABLE payments ADD COLUMN currency TEXT NOT NULL"
+    assert step.is_blocking
+
+
+def test_add_serial_primary_key_is_blocking() -> None:
+    column = Integer("payments", "id", primary_key=True)
+
+    step = generate_add_column_step(Payments, column)
+
+    assert step.sql == "ALTER TABLE payments ADD COLUMN id SERIAL PRIMARY KEY"
+    assert step.is_blocking
@@ -0,0 +1,178 @@
+import asyncio
+from datetime import datetime
+from typing import Any
+
+import pytest
+
+from orm.columns import DateTime, Float, Integer
+from orm.functions import SqlFunction
+from orm.partitions import (
+    PartitionInterval,
+    RangePartition,
+    create_future_partitions,
+    fetch_is_partitioned,
+    fetch_partitions,
+    generate_create_partition_code,
+    remove_old_partitions,
+)
+from orm.sql_generation import generate_up_migration_code
+from orm.tables import Table
+
+
+class PaymentsTable(Table):
+    __tablename__ = "payments"
+
+    payment_id = Integer("payments", "payment_id", primary_key=True)
+    amount = Float("payments", "amount")
+    created_at = DateTime("payments", "created_at", default=SqlFunction.NOW)
+
+    __partition_by__ = RangePartition(created_at, PartitionInterval.MONTH)
+
+
+Payments = PaymentsTable()
+
+
+class FakeConnection:
+    """Reports the given partitions, and records the statements executed."""
+
+    def __init__(self, partition_names: list[str], partitioned: bool = True) -> None:
+        self.partition_names = partition_names
+        self.partitioned = partitioned
+        self.executed: list[str] = []
+
+    async def fetch_one(self, query: str, values: dict[str, Any]) -> Any:
+        return {"?column?": 1} if self.partitioned else None
+
+    async def fetch_all(self, query: str, values: dict[str, Any]) -> Any:
+        return [{"partition_name": name} for name in self.partition_names]
+
+    async def execute(self, query: str) -> None:
+        self.executed.append(query)
+
+
+@pytest.mark.parametrize(
+    ("interval", "expected"),
+    [
+        (PartitionInterval.DAY, datetime(2026, 10, 15)),
+        (PartitionInterval.WEEK, datetime(2026, 10, 12)),  # a monday
+        (PartitionInterval.MONTH, datetime(2026, 10, 1)),
+        (PartitionInterval.YEAR, datetime(2026, 1, 1)),
+    ],
+)
+def test_floor(interval: PartitionInterval, expected: datetime) -> None:
+    assert interval.floor(datetime(2026, 10, 15, 13, 45, 30, 500)) == expected
+
+
+@pytest.mark.parametrize(
+    ("interval", "dt", "n", "expected"),
+    [
+        (PartitionInterval.DAY, datetime(2026, 12, 31), 1, datetime(2027, 1, 1)),
+        (PartitionInterval.DAY, datetime(2026, 1, 1), -1, datetime(2025, 12, 31)),
+        (PartitionInterval.WEEK, datetime(2026, 12, 28), 1, datetime(2027, 1, 4)),
+        (PartitionInterval.WEEK, datetime(2026, 1, 5), -2, datetime(2025, 12, 22)),
+        (PartitionInterval.MONTH, datetime(2026, 12, 1), 1, datetime(2027, 1, 1)),
+        (PartitionInterval.MONTH, datetime(2026, 11, 1), 14, datetime(2028, 1, 1)),
+        (PartitionInterval.MONTH, datetime(2026, 1, 1), -1, datetime(2025, 12, 1)),
+        (PartitionInterval.MONTH, datetime(2026, 3, 1), -15, datetime(2024, 12, 1)),
+        (PartitionInterval.YEAR, datetime(2026, 1, 1), -3, datetime(2023, 1, 1)),
+    ],
+)
+def test_shift(
+    interval: PartitionInterval,
+    dt: datetime,
+    n: int,
+    expected: datetime,
+) -> None:
+    assert interval.shift(dt, n) == expected
+
+
+def test_create_partition_code() -> None:
+    assert generate_create_partition_code(Payments, datetime(2026, 12, 1)) == (
+        "CREATE TABLE IF NOT EXISTS payments_p20261201 PARTITION OF payments\n"
+        "FOR VALUES FROM ('2026-12-01T00:00:00') TO ('2027-01-01T00:00:00');"
+    )
+
+
+def test_partitioned_up_migration_code() -> None:
+    assert generate_up_migration_code(Payments) == (
+        "CREATE TABLE payments (\n"
+        "    payment_id SERIAL NOT NULL,\n"
+        "    amount FLOAT NOT NULL,\n"
+        "    created_at TIMESTAMP NOT NULL DEFAULT NOW(),\n"
+        "    PRIMARY KEY (payment_id, created_at)\n"
+        ") PARTITION BY RANGE (created_at);"
+    )
+
+
+@pytest.mark.parametrize("partitioned", [True, False])
+def test_fetch_is_partitioned(partitioned: bool) -> None:
+    connection: Any = FakeConnection([], partitioned=partitioned)
+
+    assert asyncio.run(fetch_is_partitioned(connection, Payments)) is partitioned
+
+
+def test_fetch_partitions_ignores_foreign_partitions() -> None:
+    connection: Any = FakeConnection(
+        ["payments_p20261001", "payments_default", "payments_pbackup", "other"]
+    )
+
+    partitions = asyncio.run(fetch_partitions(connection, Payments))
+
+    assert partitions == {"payments_p20261001": datetime(2026, 10, 1)}
+
+
+def test_create_future_partitions_skips_existing() -> None:
+    connection: Any = FakeConnection(["payments_p20261001", "payments_p20261201"])
+
+    created = asyncio.run(
+        create_future_partitions(connection, Payments, now=datetime(2026, 10, 19))
+    )
+
+    assert created == ["payments_p20261101", "payments_p20270101"]
+    assert connection.executed == [
+        generate_create_partition_code(Payments, datetime(2026, 11, 1)),
+        generate_create_partition_code(Payments, datetime(2027, 1, 1)),
+    ]
+
+
+def test_remove_old_partitions() -> None:
+    connection: Any = FakeConnection(
+        [
+            "payments_p20260801",
+            "payments_p20260601",
+            "payments_p20260701",
+            "payments_p20261001",
+        ]
+    )
+
+    # with 2 intervals retained, anything before 2026-08-01 is removed
+    removed = asyncio.run(
+        remove_old_partitions(connection, Payments, 2, now=datetime(2026, 10, 19))
+    )
+
+    assert removed == ["payments_p20260601", "payments_p20260701"]
+    assert connection.executed == [
+        "ALTER TABLE payments DETACH PARTITION payments_p20260601 CONCURRENTLY",
+        "DROP TABLE payments_p20260601",
+        "ALTER TABLE payments DETACH PARTITION payments_p20260701 CONCURRENTLY",
+        "DROP TABLE payments_p20260701",
+    ]
+
+
+def test_remove_old_partitions_without_dropping() -> None:
+    connection: Any = FakeConnection(["payments_p20260701", "payments_p20261001"])
+
+    removed = asyncio.run(
+        remove_old_partitions(
+            connection,
+            Payments,
+            2,
+            now=datetime(2026, 10, 19),
+            drop=False,
+        )
+    )
+
+    assert removed == ["payments_p20260701"]
+    assert connection.executed == [
+        "ALTER TABLE payments DETACH PARTITION payments_p20260701 CONCURRENTLY",
+    ]
@@ -0,0 +1,46 @@
+import pytest
+
+from orm.columns import Float, Integer, String
+from orm.queries.update import bulk_update
+from orm.tables import Table
+
+
+class PaymentsTable(Table):
+    __tablename__ = "payments"
+
+    payment_id = Integer("payments", "payment_id", primary_key=True)
+    amount = Float("payments", "amount")
+    currency = String("payments", "currency")
+
+
+Payments = PaymentsTable()
+
+
+def test_bulk_update() -> None:
+    query = (
+        bulk_update()
+        .table(Payments)
+        .key(Payments.payment_id)
+        .values(1, [(Payments.amount, 5.0), (Payments.currency, "EUR")])
+        .values(2, [(Payments.amount, 7.5), (Payments.currency, "GBP")])
+    )
+
+    assert query.convert_to_sql() == (
+        "UPDATE payments SET amount = v.amount::FLOAT, currency = v.currency::TEXT "
+        "FROM (VALUES (1, 5.0, 'EUR'), (2, 7.5, 'GBP')) "
+        "AS v (payment_id, amount, currency) "
+        "WHERE payments.payment_id = v.payment_id"
+    )
+
+
+def test_bulk_update_rows_must_set_the_same_columns() -> None:
+    query = (
+        bulk_update()
+        .table(Payments)
+        .key(Payments.payment_id)
+        .values(1, [(Payments.amount, 5.0)])
+        .values(2, [(Payments.currency, "GBP")])
+    )
+
+    with pytest.raises(AssertionError):
+        query.convert_to_sql()
@@ -0,0 +1,389 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from orm import state
+from orm._typing import Unset
+from orm.columns import (
+    Aggregate,
+    AggregateType,
+    BinaryOperation,
+    Column,
+    DateTime,
+    Float,
+    Integer,
+    OperationType,
+    SqlLiteral,
+)
+from orm.connections import Connection
+from orm.limiters import ConcurrencyLimiter
+from orm.queries import Order, Query
+from orm.queries.insert import insert
+from orm.queries.select import Select, select
+from orm.sharding import (
+    SHARD_ORDER_KEY,
+    RangeShardFunction,
+    ShardedConnection,
+    ShardOrderKey,
+    combine_aggregates,
+    find_shard_key_value,
+    get_shard_aggregates,
+    hash_shard_function,
+    merge_shard_results,
+)
+from orm.tables import Table
+
+
+class PaymentsTable(Table):
+    __tablename__ = "payments"
+
+    payment_id = Integer("payments", "payment_id", primary_key=True)
+    account_id = Integer("payments", "account_id")
+    amount = Float("payments", "amount", nullable=True)
+    created_at = DateTime("payments", "created_at")
+
+
+Payments = PaymentsTable()
+
+
+class FakeShard:
+    """A stand-in for a shard's Connection, serving rows from memory."""
+
+    def __init__(
+        self,
+        rows: list[dict[str, Any]],
+        aggregate_row: dict[str, Any] | None = None,
+    ) -> None:
+        self.rows = rows
+        self.aggregate_row = aggregate_row
+        self.queries: list[Query | str] = []
+        self.values: list[dict[str, Any] | None] = []
+
+    async def fetch_all(
+        self,
+        query: Query | str,
+        values: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        self.queries.append(query)
+        self.values.append(values)
+        if not isinstance(query, Select):
+            return []
+        if self.aggregate_row is not None:
+            return [dict(self.aggregate_row)]
+
+        rows = [dict(row) for row in self.rows]
+        if query._order_by is not None:
+            column, order = query._order_by
+            rows.sort(
+                key=lambda row: (
+                    row[column._column_name] is None,
+                    row[column._column_name],
+                ),
+                reverse=order is Order.DESC,
+            )
+        if query._limit is not None:
+            rows = rows[: query._limit]
+
+        # project the rows onto the select list
+        projected_rows = []
+        for row in rows:
+            projected_row = {}
+            for expression in query._expressions:
+                if isinstance(expression, Table):
+                    projected_row.update(row)
+                elif isinstance(expression, Column):
+                    name = expression._column_name
+                    projected_row[name] = row[name]
+                elif isinstance(expression, ShardOrderKey):
+                    name = expression._column._column_name
+                    projected_row[SHARD_ORDER_KEY] = row[name]
+            projected_rows.append(projected_row)
+        return projected_rows
+
+    async def fetch_one(
+        self,
+        query: Query | str,
+        values: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        rows = await self.fetch_all(query, values)
+        return rows[0] if rows else None
+
+    async def execute(
+        self,
+        query: Query | str,
+        values: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        self.queries.append(query)
+        self.values.append(values)
+
+
+class SlowDatabase:
+    """Stands in for a shard's databases.Database."""
+
+    async def fetch_all(self, query: str, values: Any) -> list[Any]:
+        await asyncio.sleep(0.01)
+        return []
+
+
+def sharded_connection(shards: list[FakeShard]) -> ShardedConnection:
+    connection = ShardedConnection(
+        [f"postgresql://localhost/shard_{i}" for i in range(len(shards))],
+        shard_key="account_id",
+    )
+    connection._connections = shards  # type: ignore[assignment]
+    return connection
+
+
+def test_find_shard_key_value_from_where() -> None:
+    query = select([Payments]).from_table(Payments).where([Payments.account_id == 5])
+    assert find_shard_key_value(query, "account_id") == 5
+
+
+def test_find_shard_key_value_from_reversed_where() -> None:
+    condition = BinaryOperation(SqlLiteral(5), Payments.account_id, OperationType.EQ)
+    query = select([Payments]).from_table(Payments).where([condition])
+    assert find_shard_key_value(query, "account_id") == 5
+
+
+def test_find_shard_key_value_ignores_other_conditions() -> None:
+    query = (
+        select([Payments])
+        .from_table(Payments)
+        .where([Payments.account_id > 5, Payments.payment_id == 1])
+    )
+    assert isinstance(find_shard_key_value(query, "account_id"), Unset)
+
+
+def test_find_shard_key_value_from_single_row_insert() -> None:
+    query = (
+        insert()
+        .into_table(Payments)
+        .values([(Payments.account_id, 7), (Payments.amount, 1.5)])
+    )
+    assert find_shard_key_value(query, "account_id") == 7
+
+
+def test_find_shard_key_value_from_multi_row_insert() -> None:
+    query = (
+        insert()
+        .into_table(Payments)
+        .values([(Payments.account_id, 7), (Payments.amount, 1.5)])
+        .values([(Payments.account_id, 7), (Payments.amount, 2.5)])
+    )
+    assert find_shard_key_value(query, "account_id") == 7
+
+    query.values([(Payments.account_id, 8), (Payments.amount, 3.5)])
+    assert isinstance(find_shard_key_value(query, "account_id"), Unset)
+
+
+def test_hash_shard_function_is_stable_and_in_range() -> None:
+    shards = [hash_shard_function(value, 4) for value in range(1000)]
+    assert shards == [hash_shard_function(value, 4) for value in range(1000)]
+    assert set(shards) == {0, 1, 2, 3}
+
+
+def test_range_shard_function() -> None:
+    shard_function = RangeShardFunction([100, 200])
+    assert shard_function(0, 3) == 0
+    assert shard_function(99, 3) == 0
+    assert shard_function(100, 3) == 1
+    assert shard_function(199, 3) == 1
+    assert shard_function(200, 3) == 2
+
+
+def test_combine_count_with_all_null_rows() -> None:
+    count = Aggregate(AggregateType.COUNT, Payments.amount)
+    total = Aggregate(AggregateType.SUM, Payments.amount, alias="total")
+    recs = [{"count": 0, "total": None}, {"count": 0, "total": None}]
+
+    assert combine_aggregates([count, total], recs) == {"count": 0, "total": None}
+
+
+def test_combine_min_max() -> None:
+    smallest = Aggregate(AggregateType.MIN, Payments.amount)
+    largest = Aggregate(AggregateType.MAX, Payments.amount)
+    recs = [
+        {"min": 3.0, "max": 9.0},
+        {"min": None, "max": None},
+        {"min": 1.0, "max": 4.0},
+    ]
+
+    assert combine_aggregates([smallest, largest], recs) == {"min": 1.0, "max": 9.0}
+
+
+def test_combine_avg_from_sum_and_count() -> None:
+    average = Aggregate(AggregateType.AVG, Payments.amount, alias="average")
+
+    shard_aggregates = get_shard_aggregates([average])
+    assert [aggregate.convert_to_sql() for aggregate in shard_aggregates] == [
+        "SUM(payments.amount) AS average_sum",
+        "COUNT(payments.amount) AS average_count",
+    ]
+
+    recs = [
+        {"average_sum": 10.0, "average_count": 2},
+        {"average_sum": None, "average_count": 0},
+        {"average_sum": 2.0, "average_count": 1},
+    ]
+    assert combine_aggregates([average], recs) == {"average": 4.0}
+
+
+@pytest.mark.parametrize(
+    ("order", "offset", "limit", "expected"),
+    [
+        (Order.ASC, 0, None, [1, 2, 3, 4, None, None]),
+        (Order.DESC, 0, None, [None, None, 4, 3, 2, 1]),
+        (Order.ASC, 1, 2, [2, 3]),
+        (Order.DESC, 1, 3, [None, 4, 3]),
+    ],
+)
+def test_merge_shard_results(
+    order: Order,
+    offset: int,
+    limit: int | None,
+    expected: list[int | None],
+) -> None:
+    shards = [[1, 4, None], [2, 3, None]]
+    results = [
+        [
+            {"value": value, SHARD_ORDER_KEY: value}
+            for value in sorted(
+                shard,
+                key=lambda value: (value is None, value),
+                reverse=order is Order.DESC,
+            )
+        ]
+        for shard in shards
+    ]
+
+    recs = merge_shard_results(results, order, offset, limit)
+
+    assert recs == [{"value": value} for value in expected]
+
+
+def test_fetch_all_merges_on_unselected_order_column() -> None:
+    shards = [
+        FakeShard(
+            [
+                {"payment_id": 1, "created_at": 10},
+                {"payment_id": 3, "created_at": 30},
+            ]
+        ),
+        FakeShard(
+            [
+                {"payment_id": 2, "created_at": 20},
+                {"payment_id": 4, "created_at": 40},
+            ]
+        ),
+    ]
+    query = (
+        select([Payments.payment_id])
+        .from_table(Payments)
+        .order_by(Payments.created_at, Order.DESC)
+        .offset(1)
+        .limit(2)
+    )
+
+    recs = asyncio.run(sharded_connection(shards).fetch_all(query))
+
+    assert recs == [{"payment_id": 3}, {"payment_id": 2}]
+    for shard in shards:
+        [shard_query] = shard.queries
+        assert shard_query.convert_to_sql() == (
+            "SELECT payments.payment_id, payments.created_at AS _shard_order_key "
+            "FROM payments ORDER BY payments.created_at DESC LIMIT 3"
+        )
+
+
+def test_fetch_all_routes_pinned_queries_to_one_shard() -> None:
+    shards = [FakeShard([]), FakeShard([])]
+    query = select([Payments]).from_table(Payments).where([Payments.account_id == 5])
+
+    asyncio.run(sharded_connection(shards).fetch_all(query))
+
+    shard = hash_shard_function(5, 2)
+    assert len(shards[shard].queries) == 1
+    assert len(shards[1 - shard].queries) == 0
+
+
+def test_fetch_all_combines_aggregates() -> None:
+    shards = [
+        FakeShard(
+            [],
+            aggregate_row={"total": 5.0, "average_sum": 5.0, "average_count": 1},
+        ),
+        FakeShard(
+            [],
+            aggregate_row={"total": 7.0, "average_sum": 7.0, "average_count": 3},
+        ),
+    ]
+    query = select(
+        [
+            Aggregate(AggregateType.SUM, Payments.amount, alias="total"),
+            Aggregate(AggregateType.AVG, Payments.amount, alias="average"),
+        ]
+    ).from_table(Payments)
+
+    recs = asyncio.run(sharded_connection(shards).fetch_all(query))
+
+    assert recs == [{"total": 12.0, "average": 3.0}]
+
+
+def test_execute_splits_multi_row_inserts_across_shards() -> None:
+    shards = [FakeShard([]), FakeShard([])]
+    query = insert().into_table(Payments)
+    for account_id in range(10):
+        query.values([(Payments.account_id, account_id), (Payments.amount, 1.0)])
+
+    asyncio.run(sharded_connection(shards).execute(query))
+
+    for shard_index, shard in enumerate(shards):
+        [shard_query] = shard.queries
+        assert {
+            value._value
+            for row in shard_query._rows
+            for column, value in row
+            if column._column_name == "account_id"
+        } == {
+            account_id
+            for account_id in range(10)
+            if hash_shard_function(account_id, 2) == shard_index
+        }
+
+
+def test_values_are_passed_to_every_shard() -> None:
+    shards = [FakeShard([]), FakeShard([])]
+    connection = sharded_connection(shards)
+    values = {"account_id": 5}
+
+    asyncio.run(connection.fetch_all("SELECT * FROM payments", values))
+    asyncio.run(connection.execute("DELETE FROM payments", values))
+
+    for shard in shards:
+        assert shard.values == [values, values]
+
+
+def test_fan_out_takes_one_limiter_slot(monkeypatch: pytest.MonkeyPatch) -> None:
+    limiter = ConcurrencyLimiter("analytics", max_concurrency=4, max_queued=2)
+    monkeypatch.setitem(state.LIMITERS, "analytics", limiter)
+    connection = ShardedConnection(
+        [f"postgresql://localhost/shard_{i}" for i in range(8)],
+        shard_key="account_id",
+    )
+    for shard in connection._connections:
+        shard._connection = SlowDatabase()  # type: ignore[assignment]
+
+    async def run() -> list[list[dict[str, Any]]]:
+        # a scatter over 8 shards is one logical query, so 6 of them fit
+        return await asyncio.gather(
+            *(
+                connection.fetch_all("SELECT 1", limiter="analytics")
+                for _ in range(6)
+            )
+        )
+
+    assert asyncio.run(run()) == [[]] * 6
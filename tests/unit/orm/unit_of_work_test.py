@@ -0,0 +1,170 @@
+import pytest
+
+from orm import state
+from orm.columns import Float, Integer, String
+from orm.queries.delete import Delete
+from orm.queries.insert import Insert
+from orm.queries.update import BulkUpdate, Update
+from orm.tables import Table
+from orm.unit_of_work import UnitOfWork
+
+
+class AccountsTable(Table):
+    __tablename__ = "accounts"
+
+    account_id = Integer("accounts", "account_id", primary_key=True)
+    account_type = String("accounts", "account_type")
+
+
+class PaymentsTable(Table):
+    __tablename__ = "payments"
+
+    payment_id = Integer("payments", "payment_id", primary_key=True)
+    account_id = Integer("payments", "account_id")
+    amount = Float("payments", "amount")
+    currency = String("payments", "currency")
+
+
+Accounts = AccountsTable()
+Payments = PaymentsTable()
+
+
+def unit_of_work() -> UnitOfWork:
+    return UnitOfWork(None)  # type: ignore[arg-type]
+
+
+def test_updates_are_grouped_by_column_set() -> None:
+    uow = unit_of_work()
+    uow.update(Payments, 1, [(Payments.amount, 5.0)])
+    uow.update(Payments, 2, [(Payments.amount, 7.5)])
+    uow.update(Payments, 3, [(Payments.currency, "EUR"), (Payments.amount, 1.0)])
+    uow.update(Payments, 4, [(Payments.amount, 2.0), (Payments.currency, "GBP")])
+
+    queries = uow.build_queries()
+
+    assert all(isinstance(query, BulkUpdate) for query in queries)
+    assert [query.convert_to_sql() for query in queries] == [
+        "UPDATE payments SET amount = v.amount::FLOAT "
+        "FROM (VALUES (1, 5.0), (2, 7.5)) AS v (payment_id, amount) "
+        "WHERE payments.payment_id = v.payment_id",
+        "UPDATE payments SET amount = v.amount::FLOAT, currency = v.currency::TEXT "
+        "FROM (VALUES (3, 1.0, 'EUR'), (4, 2.0, 'GBP')) "
+        "AS v (payment_id, amount, currency) "
+        "WHERE payments.payment_id = v.payment_id",
+    ]
+
+
+def test_single_row_update() -> None:
+    uow = unit_of_work()
+    uow.update(Payments, 1, [(Payments.amount, 5.0)])
+    uow.update(Payments, 1, [(Payments.amount, 6.0)])
+
+    [query] = uow.build_queries()
+
+    assert isinstance(query, Update)
+    assert query.convert_to_sql() == (
+        "UPDATE payments SET amount = 6.0 WHERE payments.payment_id = 1"
+    )
+
+
+def test_inserts_are_grouped_by_columns() -> None:
+    uow = unit_of_work()
+    uow.insert(Payments, [(Payments.account_id, 1), (Payments.amount, 5.0)])
+    uow.insert(Payments, [(Payments.account_id, 2)])
+    uow.insert(Payments, [(Payments.account_id, 3), (Payments.amount, 7.5)])
+
+    queries = uow.build_queries()
+
+    assert all(isinstance(query, Insert) for query in queries)
+    assert [len(query._rows) for query in queries] == [2, 1]
+
+
+def test_delete_drops_queued_updates() -> None:
+    uow = unit_of_work()
+    uow.update(Payments, 1, [(Payments.amount, 5.0)])
+    uow.delete(Payments, 1)
+
+    [query] = uow.build_queries()
+
+    assert isinstance(query, Delete)
+    assert query.convert_to_sql() == (
+        "DELETE FROM payments WHERE payments.payment_id IN (1)"
+    )
+
+
+def test_update_after_delete_raises() -> None:
+    uow = unit_of_work()
+    uow.delete(Payments, 1)
+
+    with pytest.raises(ValueError):
+        uow.update(Payments, 1, [(Payments.amount, 5.0)])
+
+
+def test_delete_then_insert_deletes_first() -> None:
+    uow = unit_of_work()
+    uow.delete(Payments, 1)
+    uow.delete(Payments, 2)
+    uow.insert(Payments, [(Payments.payment_id, 1), (Payments.amount, 5.0)])
+
+    queries = uow.build_queries()
+
+    assert [query.convert_to_sql() for query in queries] == [
+        "DELETE FROM payments WHERE payments.payment_id IN (1)",
+        "INSERT INTO payments (payment_id, amount) VALUES (1, 5.0)",
+        "DELETE FROM payments WHERE payments.payment_id IN (2)",
+    ]
+
+
+def test_table_order(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        state,
+        "TABLE_INSTANCES",
+        {"accounts": Accounts, "payments": Payments},
+    )
+    uow = unit_of_work()
+    uow.delete(Accounts, 2)
+    uow.delete(Payments, 3)
+    uow.insert(Payments, [(Payments.account_id, 1)])
+    uow.insert(Accounts, [(Accounts.account_id, 1)])
+    uow.update(Payments, 4, [(Payments.amount, 5.0)])
+    uow.update(Accounts, 5, [(Accounts.account_type, "premium")])
+
+    queries = uow.build_queries()
+
+    # parents first, except for deletes
+    assert [query.convert_to_sql() for query in queries] == [
+        "INSERT INTO accounts (account_id) VALUES (1)",
+        "INSERT INTO payments (account_id) VALUES (1)",
+        "UPDATE accounts SET account_type = 'premium' "
+        "WHERE accounts.account_id = 5",
+        "UPDATE payments SET amount = 5.0 WHERE payments.payment_id = 4",
+        "DELETE FROM payments WHERE payments.payment_id IN (3)",
+        "DELETE FROM accounts WHERE accounts.account_id IN (2)",
+    ]
+
+
+def test_delete_drops_queued_insert() -> None:
+    uow = unit_of_work()
+    uow.insert(Payments, [(Payments.payment_id, 1), (Payments.amount, 1.0)])
+    uow.insert(Payments, [(Payments.payment_id, 2), (Payments.amount, 1.5)])
+    uow.delete(Payments, 1)
+    uow.insert(Payments, [(Payments.payment_id, 1), (Payments.amount, 2.0)])
+
+    queries = uow.build_queries()
+
+    assert [query.convert_to_sql() for query in queries] == [
+        "INSERT INTO payments (payment_id, amount) VALUES (2, 1.5), (1, 2.0)",
+    ]
+
+
+def test_delete_of_reinserted_row_still_deletes_the_original() -> None:
+    uow = unit_of_work()
+    uow.delete(Payments, 1)
+    uow.insert(Payments, [(Payments.payment_id, 1), (Payments.amount, 2.0)])
+    uow.delete(Payments, 1)
+
+    queries = uow.build_queries()
+
+    assert [query.convert_to_sql() for query in queries] == [
+        "DELETE FROM payments WHERE payments.payment_id IN (1)",
+    ]